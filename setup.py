@@ -43,11 +43,17 @@ setup(
         "test": [
             "plone.app.testing",
             "unittest2",
-        ]
+        ],
+        "xlsx": [
+            "openpyxl<3",
+        ],
     },
     entry_points="""
       # -*- Entry points: -*-
       [z3c.autoinclude.plugin]
       target = plone
+
+      [zopectl.command]
+      import_breakpoints = senaite.ast.console:import_breakpoints
       """,
 )
@@ -20,8 +20,6 @@
 
 from bika.lims import api
 from bika.lims.interfaces import IGuardAdapter
-from bika.lims.interfaces import ISubmitted
-from bika.lims.interfaces import IVerified
 from senaite.ast import utils
 from senaite.ast.config import DISK_CONTENT_KEY
 from senaite.ast.config import MIC_KEY
@@ -59,25 +57,12 @@ class SampleGuardAdapter(BaseGuardAdapter):
     def guard_submit(self):
         """Returns true when results for valid AST analyses have been submitted
         """
-        # Get the valid AST-like analyses
-        analyses = utils.get_ast_analyses(self.context)
-        submitted = map(ISubmitted.providedBy, analyses)
-        if all(submitted):
-            # All AST-like analyses have been submitted
-            return True
-
-        return False
+        return utils.is_ast_done(self.context, "submit")
 
     def guard_verify(self):
         """Returns true if all valid AST analyses have been verified.
         """
-        analyses = utils.get_ast_analyses(self.context)
-        verified = map(IVerified.providedBy, analyses)
-        if all(verified):
-            # All AST-like analyses have been verified
-            return True
-
-        return False
+        return utils.is_ast_done(self.context, "verify")
 
 
 @implementer(IGuardAdapter)
@@ -25,6 +25,10 @@ from senaite.app.listing.interfaces import IListingViewAdapter
 from senaite.app.listing.utils import add_column
 from senaite.ast import check_installed
 from senaite.ast import messageFactory as _
+from senaite.ast.utils import get_abbreviation
+from senaite.ast.utils import get_antibiotic_brain
+from senaite.ast.utils import get_antibiotic_brains
+from senaite.ast.utils import get_extrapolated_uids
 from zope.component import adapter
 from zope.interface import implementer
 
@@ -53,17 +57,19 @@ class AntibioticsListingViewAdapter(object):
 
     @check_installed(None)
     def folder_item(self, obj, item, index):
-        obj = api.get_object(obj)
-        extrapolated_uids = obj.extrapolated_antibiotics or []
-        extrapolated_links = map(self.get_link, extrapolated_uids)
+        extrapolated_uids = get_extrapolated_uids(obj)
+        extrapolated = get_antibiotic_brains(extrapolated_uids)
+        extrapolated_links = map(self.get_link, extrapolated)
         item["Extrapolated"] = extrapolated_uids
         item["replace"]["Extrapolated"] = ", ".join(extrapolated_links)
 
-    def get_link(self, antibiotic_uid):
-        obj = api.get_object(antibiotic_uid)
-        url = api.get_url(obj)
-        title = api.get_title(obj)
-        abbr = obj.abbreviation
+    def get_link(self, antibiotic):
+        if api.is_uid(antibiotic):
+            uid = antibiotic
+            antibiotic = get_antibiotic_brain(uid) or api.get_object(uid)
+        url = api.get_url(antibiotic)
+        title = api.get_title(antibiotic)
+        abbr = get_abbreviation(antibiotic)
         if abbr:
             title = "{} ({})".format(title, abbr)
         return get_link(href=url, value=title)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+from bika.lims import api
+from senaite.app.listing.interfaces import IListingView
+from senaite.app.listing.interfaces import IListingViewAdapter
+from senaite.ast import check_installed
+from senaite.ast import messageFactory as _
+from zope.component import adapter
+from zope.interface import implementer
+
+
+@implementer(IListingViewAdapter)
+@adapter(IListingView)
+class SamplesViewAdapter(object):
+    """Adapter for samples listing. Adds the button for the assignment of an
+    AST Panel to the selected samples at once
+    """
+
+    # Priority order of this adapter over others
+    priority_order = 50
+
+    def __init__(self, listing, context):
+        self.listing = listing
+        self.context = context
+
+    @check_installed(None)
+    def before_render(self):
+        assign_panel = {
+            "id": "modal_assign_ast_panel",
+            "title": _("Assign AST Panel"),
+            "url": "{}/assign_ast_panel".format(api.get_url(self.context)),
+        }
+        for review_state in self.listing.review_states:
+            custom_transitions = review_state.setdefault(
+                "custom_transitions", [])
+            custom_transitions.append(assign_panel)
+
+    def folder_item(self, obj, item, index):  # noqa
+        return item
@@ -0,0 +1,548 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+
+import collections
+import threading
+from array import array
+
+from Acquisition import aq_base
+from bika.lims import api
+from plone.memoize import ram
+from senaite.ast.behaviors.breakpointstable import IBreakpointsTableSchema
+from senaite.ast.cache import object_stamp_cache_key
+from senaite.ast.microorganisms import get_microorganisms_index
+from senaite.core.catalog import SETUP_CATALOG
+from zope.schema import Int
+from zope.schema.interfaces import ValidationError
+
+# Fields of a breakpoint (row) from a BreakpointsTable
+BREAKPOINT_FIELDS = (
+    "antibiotic",
+    "microorganism",
+    "mic_s",
+    "mic_r",
+    "disk_content",
+    "diameter_s",
+    "diameter_r",
+)
+
+
+class Breakpoint(collections.namedtuple("Breakpoint", BREAKPOINT_FIELDS)):
+    """Immutable record that represents a clinical breakpoint. Supports the
+    read-only dict-like access of the rows stored in BreakpointsTable objects
+    """
+    __slots__ = ()
+
+    def get(self, key, default=None):
+        if key not in self._fields:
+            return default
+        return getattr(self, key)
+
+    def keys(self):
+        return list(self._fields)
+
+    def to_dict(self):
+        """Returns a dict representation of this breakpoint
+        """
+        return dict(zip(self._fields, self))
+
+
+def to_breakpoint(row):
+    """Returns a Breakpoint record from the breakpoint row passed-in
+
+    :param row: a breakpoint row from a BreakpointsTable
+    :type row: dict or Breakpoint
+    :rtype: Breakpoint
+    """
+    if isinstance(row, Breakpoint):
+        return row
+    return Breakpoint(*map(row.get, BREAKPOINT_FIELDS))
+
+
+def get_breakpoint_fields(context):
+    """Returns the list of (name, field) tuples of a breakpoint row, with the
+    fields bound to the context passed-in
+
+    :param context: the BreakpointsTable the breakpoints are for
+    :rtype: list
+    """
+    fields = map(lambda name: IBreakpointsTableSchema[name], BREAKPOINT_FIELDS)
+    fields = map(lambda field: field.bind(context), fields)
+    return zip(BREAKPOINT_FIELDS, fields)
+
+
+def to_breakpoint_values(values, fields, partial=False):
+    """Returns a dict with the values of a breakpoint row, converted and
+    validated against the fields passed-in. Missing values are set to the
+    default of the field, unless partial. Raises a ValueError if a value is
+    not valid or if a required value is missing
+
+    :param values: the raw values of the breakpoint, as a dict
+    :param fields: the bound fields, as returned by get_breakpoint_fields
+    :param partial: whether missing values have to be skipped
+    :rtype: dict
+    """
+    converted = {}
+    for name, field in fields:
+        value = values.get(name)
+        if value in [None, ""]:
+            if partial:
+                continue
+            value = field.default
+        if value is None:
+            if field.required:
+                raise ValueError("{}: Required input is missing".format(name))
+            continue
+
+        if isinstance(field, Int) and isinstance(value, float):
+            # Spreadsheets return integers as floats
+            value = int(value) if value.is_integer() else value
+
+        try:
+            converted[name] = field.fromUnicode(u"{}".format(value))
+        except ValidationError as e:
+            raise ValueError("{}: {}".format(name, e.doc()))
+        except ValueError as e:
+            raise ValueError("{}: {}".format(name, e))
+
+    return converted
+
+
+# Fields of a breakpoint that store the thresholds of sensitivity categories,
+# sorted as they are stored in the arrays returned by get_thresholds
+THRESHOLD_FIELDS = (
+    "diameter_r",
+    "diameter_s",
+    "mic_r",
+    "mic_s",
+)
+
+# Thresholds of a missing breakpoint
+MISSING_THRESHOLDS = (-1.0, ) * len(THRESHOLD_FIELDS)
+
+
+def to_thresholds(breakpoint):
+    """Returns a tuple with the float thresholds of the breakpoint passed-in,
+    sorted as in THRESHOLD_FIELDS. Thresholds that are not set or are not
+    greater than zero are returned as 0. Returns MISSING_THRESHOLDS if no
+    breakpoint is passed-in
+
+    :param breakpoint: a breakpoint row from a BreakpointsTable
+    :type breakpoint: dict or Breakpoint
+    :rtype: tuple
+    """
+    if not breakpoint:
+        return MISSING_THRESHOLDS
+
+    def to_threshold(key):
+        value = api.to_float(breakpoint.get(key), default=0)
+        return 0.0 if value <= 0 else value
+
+    return tuple(map(to_threshold, THRESHOLD_FIELDS))
+
+
+def get_thresholds(breakpoints):
+    """Returns an array of floats with the thresholds of the breakpoints
+    passed-in, with as many consecutive items per breakpoint as fields in
+    THRESHOLD_FIELDS. The thresholds of the records from a BreakpointsIndex
+    are precomputed when the index is built, so they are only concatenated.
+    Other breakpoints are converted with to_thresholds
+
+    :param breakpoints: list of breakpoint rows from BreakpointsTable objects
+    :type breakpoints: list of dict or Breakpoint
+    :rtype: array.array
+    """
+    thresholds = array("d")
+    for breakpoint in breakpoints:
+        values = getattr(breakpoint, "thresholds", None)
+        if values is None:
+            values = to_thresholds(breakpoint)
+        thresholds.extend(values)
+    return thresholds
+
+
+# Numeric fields of a breakpoint, as they are stored in BreakpointsColumns
+NUMERIC_FIELDS = (
+    "mic_s",
+    "mic_r",
+    "disk_content",
+    "diameter_s",
+    "diameter_r",
+)
+
+# Numeric fields of a breakpoint that store integers
+INTEGER_FIELDS = frozenset(["disk_content", "diameter_s", "diameter_r"])
+
+# Value that represents a missing number in BreakpointsColumns
+MISSING_NUMBER = float("nan")
+
+
+def to_positions(values):
+    """Returns an array with the integers passed-in, with the smallest item
+    size that fits all of them
+    """
+    typecode = max(values or [0]) < 2 ** 16 and "H" or "I"
+    return array(typecode, values)
+
+
+class BreakpointsColumns(object):
+    """Compact and immutable storage of the rows of a BreakpointsTable.
+
+    UIDs of antibiotics and microorganisms are stored once and referred by
+    position. The numeric values of a row are stored once for all rows that
+    share them, as a profile of as many consecutive floats as NUMERIC_FIELDS,
+    and referred by position too. Each row is therefore stored as three small
+    integers. Iterating returns Breakpoint records
+    """
+    __slots__ = ("uids", "profiles", "antibiotics", "microorganisms",
+                 "numbers")
+
+    def __init__(self, uids=(), profiles=None, antibiotics=None,
+                 microorganisms=None, numbers=None):
+        self.uids = tuple(map(intern, uids))
+        self.profiles = profiles or array("d")
+        self.antibiotics = antibiotics or array("H")
+        self.microorganisms = microorganisms or array("H")
+        self.numbers = numbers or array("H")
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Returns a BreakpointsColumns with the breakpoint rows passed-in.
+        Raises a ValueError if any of the rows cannot be stored without loss
+
+        :param rows: breakpoint rows from a BreakpointsTable
+        :type rows: list of dict or Breakpoint
+        :rtype: BreakpointsColumns
+        """
+        uids = collections.OrderedDict()
+        profiles = collections.OrderedDict()
+        antibiotics = []
+        microorganisms = []
+        numbers = []
+
+        def to_position(uid):
+            if uid is None:
+                # Stored as the position next to the last UID
+                return None
+            if not isinstance(uid, basestring):
+                raise ValueError("Not a UID: {}".format(repr(uid)))
+            return uids.setdefault(str(uid), len(uids))
+
+        def to_number(key, value):
+            if value is None:
+                return MISSING_NUMBER
+            if isinstance(value, bool) or \
+                    not isinstance(value, (int, long, float)):
+                raise ValueError("Not a number: {}".format(repr(value)))
+            if key in INTEGER_FIELDS and int(value) != value:
+                raise ValueError("Not an integer: {}".format(repr(value)))
+            return float(value)
+
+        for row in rows or []:
+            if set(row.keys()).difference(BREAKPOINT_FIELDS):
+                raise ValueError("Unknown fields: {}".format(row.keys()))
+            antibiotics.append(to_position(row.get("antibiotic")))
+            microorganisms.append(to_position(row.get("microorganism")))
+            profile = tuple(map(lambda key: to_number(key, row.get(key)),
+                                NUMERIC_FIELDS))
+            # NaN is not equal to itself, use the representation as key
+            numbers.append(profiles.setdefault(repr(profile),
+                                               (len(profiles), profile))[0])
+
+        def replace_missing(positions):
+            return map(lambda pos: len(uids) if pos is None else pos,
+                       positions)
+
+        flat = array("d")
+        for position, profile in profiles.values():
+            flat.extend(profile)
+
+        return cls(uids.keys(), flat,
+                   to_positions(replace_missing(antibiotics)),
+                   to_positions(replace_missing(microorganisms)),
+                   to_positions(numbers))
+
+    def __getstate__(self):
+        return (self.uids, self.profiles.tostring(),
+                self.antibiotics.typecode, self.antibiotics.tostring(),
+                self.microorganisms.typecode, self.microorganisms.tostring(),
+                self.numbers.typecode, self.numbers.tostring())
+
+    def __setstate__(self, state):
+        self.uids = tuple(map(intern, state[0]))
+        self.profiles = array("d", state[1])
+        self.antibiotics = array(state[2], state[3])
+        self.microorganisms = array(state[4], state[5])
+        self.numbers = array(state[6], state[7])
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __iter__(self):
+        uids = self.uids + (None, )
+        size = len(NUMERIC_FIELDS)
+        integers = map(lambda key: key in INTEGER_FIELDS, NUMERIC_FIELDS)
+
+        def to_value(value, integer):
+            if value != value:
+                # NaN
+                return None
+            return int(value) if integer else value
+
+        # Convert each profile only once
+        profiles = []
+        for pos in range(0, len(self.profiles), size):
+            values = self.profiles[pos:pos + size]
+            profiles.append(map(to_value, values, integers))
+
+        for abx, micro, num in zip(self.antibiotics, self.microorganisms,
+                                   self.numbers):
+            yield Breakpoint(uids[abx], uids[micro], *profiles[num])
+
+    def to_rows(self):
+        """Returns the breakpoints as a list of dicts
+        """
+        return map(lambda record: record.to_dict(), self)
+
+
+def get_breakpoint_records(breakpoints_table):
+    """Returns the breakpoints of the BreakpointsTable passed-in as a list of
+    Breakpoint records. Records are read from the compact storage of the
+    table when available, without building the breakpoint dicts
+
+    :param breakpoints_table: BreakpointsTable object
+    :rtype: list of Breakpoint
+    """
+    columns = getattr(aq_base(breakpoints_table), "_breakpoints", None)
+    if isinstance(columns, BreakpointsColumns):
+        return list(columns)
+    return map(to_breakpoint, breakpoints_table.breakpoints or [])
+
+
+class IndexedBreakpoint(Breakpoint):
+    """Breakpoint record of a BreakpointsIndex, that keeps the float
+    thresholds of the breakpoint, sorted as in THRESHOLD_FIELDS
+    """
+
+    @classmethod
+    def from_row(cls, row):
+        """Returns an IndexedBreakpoint record with the thresholds computed
+        from the breakpoint row passed-in
+        """
+        record = cls._make(to_breakpoint(row))
+        record.thresholds = to_thresholds(record)
+        return record
+
+
+class BreakpointsIndex(object):
+    """Lookup table of breakpoints by antibiotic and microorganism (or the
+    microorganism category). When more than one row exists for the same
+    antibiotic and microorganism, the first one prevails. The category of
+    each microorganism and the thresholds of each breakpoint are resolved
+    when the index is built
+    """
+
+    def __init__(self, breakpoints, categories=None):
+        self._records = {}
+        for row in breakpoints or []:
+            key = (row.get("antibiotic"), row.get("microorganism"))
+            if key not in self._records:
+                self._records[key] = IndexedBreakpoint.from_row(row)
+
+        # Mapping of microorganism uid -> category uid, only for the
+        # categories this index has breakpoints for
+        keys = set(map(lambda key: key[1], self._records.keys()))
+        categories = categories or {}
+        self._categories = dict(filter(lambda item: item[1] in keys,
+                                       categories.items()))
+
+    def __len__(self):
+        return len(self._records)
+
+    def keys(self):
+        """Returns the (antibiotic, microorganism or category) tuples of UIDs
+        this index has a breakpoint for
+        """
+        return self._records.keys()
+
+    def get(self, antibiotic, microorganism):
+        """Returns the breakpoint for the antibiotic and microorganism UIDs
+        passed-in. If there is no breakpoint for the microorganism, returns the
+        breakpoint for the category it belongs to, if any. Returns None
+        otherwise
+        """
+        record = self._records.get((antibiotic, microorganism))
+        if record is None:
+            category = self._categories.get(microorganism)
+            if category:
+                record = self._records.get((antibiotic, category))
+        return record
+
+
+def breakpoints_index_cache_key(func, breakpoints_table):
+    """Cache key for the BreakpointsIndex of the BreakpointsTable passed-in.
+    The index depends on the table and on the categories of microorganisms,
+    that are stored in the setup catalog
+    """
+    key = object_stamp_cache_key(func, breakpoints_table)
+    counter = api.get_tool(SETUP_CATALOG).getCounter()
+    return key + (counter, )
+
+
+@ram.cache(breakpoints_index_cache_key)
+def get_breakpoints_index(breakpoints_table):
+    """Returns the BreakpointsIndex for the BreakpointsTable object passed-in.
+    The index is built once and kept in memory until the table or the setup
+    catalog are modified
+
+    :param breakpoints_table: BreakpointsTable object
+    :rtype: BreakpointsIndex
+    """
+    records = get_breakpoint_records(breakpoints_table)
+    categories = get_microorganisms_index().get_categories()
+    return BreakpointsIndex(records, categories=categories)
+
+
+class BreakpointsTablesIndex(object):
+    """Read-only inverted index that maps (antibiotic, microorganism) and
+    (antibiotic, category) tuples of UIDs to the UIDs of the active
+    BreakpointsTable objects that have a breakpoint for them
+    """
+
+    def __init__(self, tables=None, inverted=None):
+        # Mapping of table uid -> (stamp, title, keys)
+        self.tables = tables or {}
+        # Mapping of (antibiotic, microorganism or category) -> table uids
+        self.inverted = inverted or {}
+        # Mapping of table uid -> position (tables are sorted by title)
+        self.positions = {}
+
+    def search(self, antibiotic, microorganism, category=None):
+        """Returns the UIDs of the tables, sorted by title, that have a
+        breakpoint for the antibiotic and microorganism passed-in, or for the
+        category the microorganism belongs to
+        """
+        uids = set(self.inverted.get((antibiotic, microorganism), []))
+        if category is not None:
+            uids.update(self.inverted.get((antibiotic, category), []))
+        return sorted(uids, key=self.positions.get)
+
+    def get_title(self, uid):
+        """Returns the title of the table with the given UID
+        """
+        return self.tables[uid][1]
+
+    def update(self, brains):
+        """Returns an index for the BreakpointsTable brains passed-in. Only
+        the tables that were added or modified since this index was built are
+        woken-up and re-indexed. Returns this same index if no changes
+        """
+        uids = map(api.get_uid, brains)
+        stamps = map(get_modification_stamp, brains)
+        current = map(lambda uid: self.tables[uid][0], self.tables.keys())
+        if set(zip(uids, stamps)) == set(zip(self.tables.keys(), current)):
+            # Neither additions, nor modifications, nor deactivations
+            return self
+
+        tables = {}
+        inverted = dict(self.inverted)
+
+        def discard(uid, keys):
+            for key in keys:
+                inverted[key] = inverted[key] - frozenset([uid])
+                if not inverted[key]:
+                    del inverted[key]
+
+        def add(uid, keys):
+            for key in keys:
+                inverted[key] = inverted.get(key, frozenset()) | set([uid])
+
+        # Remove tables that are no longer active or that were deleted
+        for uid in set(self.tables.keys()).difference(uids):
+            discard(uid, self.tables[uid][2])
+
+        for brain, uid, stamp in zip(brains, uids, stamps):
+            existing = self.tables.get(uid)
+            if existing and existing[0] == stamp:
+                tables[uid] = existing
+                continue
+
+            if existing:
+                discard(uid, existing[2])
+
+            # Index the keys of the table that was added or modified
+            obj = api.get_object(brain)
+            keys = frozenset(get_breakpoints_index(obj).keys())
+            add(uid, keys)
+            tables[uid] = (stamp, api.get_title(brain), keys)
+
+        index = BreakpointsTablesIndex(tables, inverted)
+        index.positions = dict(map(lambda p: (p[1], p[0]), enumerate(uids)))
+        return index
+
+
+def get_modification_stamp(brain):
+    """Returns the modification date of the object the brain refers to
+    """
+    modified = getattr(brain, "modified", None)
+    if modified is None:
+        modified = api.get_object(brain).modified()
+    return modified
+
+
+_tables_index = {}
+_tables_index_lock = threading.Lock()
+
+
+def get_breakpoints_tables_index():
+    """Returns the up-to-date BreakpointsTablesIndex of the active tables. The
+    index is kept in memory and only the tables added, modified or deactivated
+    since the last call are re-indexed
+    """
+    query = {
+        "portal_type": "BreakpointsTable",
+        "sort_on": "sortable_title",
+        "sort_order": "ascending",
+        "is_active": True,
+    }
+    brains = api.search(query, SETUP_CATALOG)
+    site = api.get_path(api.get_portal())
+    with _tables_index_lock:
+        index = _tables_index.get(site) or BreakpointsTablesIndex()
+        index = index.update(brains)
+        _tables_index[site] = index
+    return index
+
+
+def invalidate_breakpoints_table(breakpoints_table):
+    """Flags the BreakpointsTable passed-in for re-indexing on next access to
+    the BreakpointsTablesIndex
+    """
+    uid = api.get_uid(breakpoints_table)
+    with _tables_index_lock:
+        for site, index in _tables_index.items():
+            table = index.tables.get(uid)
+            if table:
+                tables = dict(index.tables)
+                tables[uid] = (None, table[1], table[2])
+                updated = BreakpointsTablesIndex(tables, index.inverted)
+                updated.positions = index.positions
+                _tables_index[site] = updated
@@ -18,10 +18,16 @@
 # Copyright 2020-2025 by it's authors.
 # Some rights reserved, see README and LICENSE.
 
+import json
+
+import transaction
 from bika.lims import api
-from plone.memoize import view
+from bika.lims.api.security import check_permission
+from plone.protect import CheckAuthenticator
 from Products.Five.browser import BrowserView
+from senaite.ast import logger
 from senaite.ast import utils
+from senaite.ast.cache import flush_request_cache
 from senaite.ast.config import BREAKPOINTS_TABLE_KEY
 from senaite.ast.config import DISK_CONTENT_KEY
 from senaite.ast.config import METHOD_DIFFUSION_DISK_ID
@@ -31,8 +37,17 @@ from senaite.ast.config import REPORT_EXTRAPOLATED_KEY
 from senaite.ast.config import REPORT_KEY
 from senaite.ast.config import RESISTANCE_KEY
 from senaite.ast.config import ZONE_SIZE_KEY
+from senaite.ast.interfaces import IASTPanel
+from senaite.ast.utils import get_antibiotic_brains
 from senaite.ast.utils import get_extrapolated_antibiotics
 from senaite.ast.utils import update_breakpoint_tables_choices
+from senaite.core.permissions import ManageAnalysisRequests
+from zExceptions import Forbidden
+from ZODB.POSException import ConflictError
+
+# Number of samples to process before the transaction is committed when a
+# panel is assigned to more than one sample at once
+BULK_COMMIT_THRESHOLD = 10
 
 
 class AddPanelView(BrowserView):
@@ -45,75 +60,236 @@ class AddPanelView(BrowserView):
         panel_uid = self.request.form.get("panel_uid")
         panel = api.get_object(panel_uid)
 
-        # Get the objects assigned to the panel
-        antibiotics = map(api.get_object, panel.antibiotics)
-        microorganisms = map(api.get_object, panel.microorganisms)
+        # Create an analysis for each microorganism
+        assignment = PanelAssignment(panel)
+        assignment.assign(self.context)
+
+        return "{} objects affected".format(len(panel.microorganisms))
+
+
+class BulkAddPanelView(BrowserView):
+    """End-point for the addition of a Panel to more than one sample at once,
+    based on the panel uid and the sample uids from the POST. Returns a JSON
+    with the outcome for each sample
+    """
+
+    def __call__(self):
+        check_submit(self.request)
+        form = self.request.form
+        self.request.response.setHeader("Content-Type", "application/json")
+
+        # Get the panel
+        panel = api.get_object(form.get("panel_uid"), default=None)
+        if not IASTPanel.providedBy(panel):
+            self.request.response.setStatus(400)
+            return json.dumps({"error": "No valid panel"})
+
+        # Get the samples
+        uids = form.get("uids") or []
+        if not isinstance(uids, (list, tuple)):
+            uids = uids.split(",")
+
+        outcomes = assign_panel(panel, filter(api.is_uid, uids))
+        return json.dumps({
+            "panel": api.get_uid(panel),
+            "samples": outcomes,
+        })
+
+
+def check_submit(request):
+    """Checks the request passed-in is a POST with a valid CSRF token. Raises
+    a Forbidden otherwise. Must be called before the assignment of a panel to
+    more than one sample, cause the transaction is committed in batches before
+    the automatic CSRF protection has the chance to kick in
+    """
+    if request.get("REQUEST_METHOD") != "POST":
+        raise Forbidden("Request must be POST")
+    CheckAuthenticator(request)
+
+
+def assign_panel(panel, samples, commit_threshold=BULK_COMMIT_THRESHOLD):
+    """Assigns the panel to the samples passed-in. Each sample is processed
+    within a savepoint, so a failure only discards the changes for that
+    sample, and the transaction is committed every time the number of samples
+    processed reaches the commit threshold. Returns a list of dicts with the
+    outcome for each sample
+
+    A ConflictError is not handled, so the publisher can retry the request.
+    Re-assigning the panel to samples already committed by a former attempt
+    is harmless: existing AST analyses are updated in place and antibiotics
+    that are already assigned are not added twice
+
+    :param panel: the AST Panel to assign
+    :param samples: samples to assign the panel to
+    :type samples: list of sample objects, brains or uids
+    :param commit_threshold: number of samples to process before commit
+    :returns: list of dicts with the keys uid, id, status and message
+    """
+    outcomes = []
+    samples = list(samples)
+    assignment = PanelAssignment(panel)
+    total = len(samples)
+    for num, sample in enumerate(samples, start=1):
+        sample = api.get_object(sample, default=None)
+        outcome = assign_panel_to_sample(assignment, sample)
+        outcomes.append(outcome)
+
+        if num % commit_threshold == 0 and num < total:
+            logger.info("Assign panel '{}': {}/{}".format(
+                api.get_id(panel), num, total))
+            transaction.commit()
+
+    return outcomes
+
+
+def assign_panel_to_sample(assignment, sample):
+    """Assigns the panel of the assignment passed-in to the sample within a
+    savepoint and returns a dict with the outcome
+    """
+    if not sample or api.get_portal_type(sample) != "AnalysisRequest":
+        return {
+            "uid": sample and api.get_uid(sample),
+            "id": sample and api.get_id(sample),
+            "status": "error",
+            "message": "Not a sample",
+        }
+
+    outcome = {
+        "uid": api.get_uid(sample),
+        "id": api.get_id(sample),
+    }
+    if not check_permission(ManageAnalysisRequests, sample):
+        outcome.update({
+            "status": "error",
+            "message": "Not allowed",
+        })
+        return outcome
+
+    savepoint = transaction.savepoint()
+    try:
+        analyses = assignment.assign(sample)
+    except ConflictError:
+        # Let the publisher retry the request
+        raise
+    except Exception as e:  # noqa
+        savepoint.rollback()
+        # Flush the values cached during the request, they might refer to
+        # analyses or states that were discarded with the savepoint
+        utils.invalidate_ast_groups(sample)
+        utils.invalidate_ast_status(sample)
+        flush_request_cache("result_options")
+        logger.error("Cannot assign panel to sample '{}': {}".format(
+            api.get_id(sample), repr(e)))
+        outcome.update({
+            "status": "error",
+            "message": str(e),
+        })
+        return outcome
+
+    if not analyses:
+        outcome.update({
+            "status": "skipped",
+            "message": "No identified microorganisms in panel",
+        })
+        return outcome
+
+    outcome.update({
+        "status": "success",
+        "message": "{} analyses affected".format(len(analyses)),
+    })
+    return outcome
+
+
+class PanelAssignment(object):
+    """Creates or updates the analyses of a sample based on the configuration
+    of an AST panel. The panel settings, the antibiotics, the microorganisms
+    and the services are resolved only once, so they are reused when the
+    panel is assigned to more than one sample
+    """
+
+    def __init__(self, panel):
+        self.panel = panel
+        self.antibiotics = get_antibiotic_brains(panel.antibiotics or [])
+        self.microorganisms = map(api.get_object, panel.microorganisms)
+        self.extrapolated = get_extrapolated_antibiotics(self.antibiotics,
+                                                         uids=True)
+        self.services = {}
+        self.sample = None
+        self.existing = {}
+
+    def assign(self, sample):
+        """Creates or updates the analyses of the sample passed-in. Returns
+        the list of analyses created or updated
+        """
+        self.sample = sample
+
+        # Do a mapping title:analysis with existing AST analyses
+        analyses = utils.get_ast_analyses(sample)
+        existing = map(api.get_title, analyses)
+        self.existing = dict(zip(existing, analyses))
 
         # Exclude those not identified in the current sample
-        identified = utils.get_identified_microorganisms(self.context)
-        microorganisms = filter(lambda m: m in identified, microorganisms)
+        identified = utils.get_identified_microorganisms(sample)
+        microorganisms = filter(lambda m: m in identified, self.microorganisms)
 
         # Create an analysis for each microorganism
+        output = []
+        panel = self.panel
+        antibiotics = self.antibiotics
         add = self.add_ast_analysis
         for microorganism in microorganisms:
 
             # Create/Update the breakpoints table analysis
             if panel.breakpoints_table:
-                self.add_breakpoints_analysis(
-                    panel, microorganism, antibiotics
-                )
+                output.append(self.add_breakpoints_analysis(microorganism))
 
             if panel.method == METHOD_DIFFUSION_DISK_ID:
                 # Create/Update the disk content (potency) analysis
                 if panel.disk_content:
-                    add(DISK_CONTENT_KEY, microorganism, antibiotics)
+                    output.append(add(DISK_CONTENT_KEY, microorganism))
 
                 # Create/Update the zone size analysis
                 if panel.zone_size:
-                    add(ZONE_SIZE_KEY, microorganism, antibiotics)
+                    output.append(add(ZONE_SIZE_KEY, microorganism))
 
             elif panel.method == METHOD_MIC_ID:
                 # Create/Update the minimum inhibitory concentration analysis
                 if panel.mic_value:
-                    self.add_mic_analysis(microorganism, antibiotics)
+                    output.append(self.add_mic_analysis(microorganism))
 
             # Create/Update the sensitivity result analysis
-            self.add_ast_analysis(RESISTANCE_KEY, microorganism, antibiotics)
+            output.append(add(RESISTANCE_KEY, microorganism))
 
             # Create/Update the selective reporting analyses
             if panel.selective_reporting:
-                self.add_reporting_analysis(microorganism, antibiotics)
+                output.append(self.add_reporting_analysis(microorganism))
 
                 # If there are extrapolated antibiotics defined, add the
                 # analysis for selective reporting of extrapolated
-                extra = get_extrapolated_antibiotics(antibiotics, uids=True)
-                if extra:
-                    add(REPORT_EXTRAPOLATED_KEY, microorganism, antibiotics)
+                if self.extrapolated:
+                    output.append(add(REPORT_EXTRAPOLATED_KEY, microorganism))
 
-        return "{} objects affected".format(len(panel.microorganisms))
+        return output
 
-    @view.memoize
-    def get_ast_analyses_info(self):
-        """Returns a dict of (title, analyses) with the analyses assigned to
-        the current sample
+    def get_service(self, keyword):
+        """Returns the analysis service for the given keyword
         """
-        # Get the existing AST analyses from this sample
-        analyses = utils.get_ast_analyses(self.context)
-
-        # Do a mapping title:analysis
-        existing = map(api.get_title, analyses)
-        return dict(zip(existing, analyses))
+        service = self.services.get(keyword)
+        if service is None:
+            service = utils.get_service(keyword)
+            self.services[keyword] = service
+        return service
 
     def get_analysis(self, title):
         """Search for an existing and valid AST-like analysis in current sample
         """
-        existing = self.get_ast_analyses_info()
-        return existing.get(title)
+        return self.existing.get(title)
 
-    def add_ast_analysis(self, keyword, microorganism, antibiotics):
+    def add_ast_analysis(self, keyword, microorganism):
         """Updates or creates an ast analysis for the microorganism and
-        antibiotics passed-in
+        antibiotics of the panel
         """
+        antibiotics = self.antibiotics
         title = utils.get_analysis_title(keyword, microorganism)
         analysis = self.get_analysis(title)
         if analysis:
@@ -122,48 +298,47 @@ class AddPanelView(BrowserView):
             return analysis
 
         # Create a new analysis
-        sample = self.context
-        return utils.create_ast_analysis(sample, keyword, microorganism,
-                                         antibiotics)
+        service = self.get_service(keyword)
+        return utils.create_ast_analysis(self.sample, keyword, microorganism,
+                                         antibiotics, service=service)
 
-    def add_breakpoints_analysis(self, panel, microorganism, antibiotics):
+    def add_breakpoints_analysis(self, microorganism):
         """Updates or creates an analysis for the selection of the clinical
         breakpoints table to use for the automatic calculation of the
         sensitivity testing category (I/R/S) based on the zone diameter (mm)
         submitted by the user
         """
         # Create/update the analysis
-        analysis = self.add_ast_analysis(BREAKPOINTS_TABLE_KEY, microorganism,
-                                         antibiotics)
+        analysis = self.add_ast_analysis(BREAKPOINTS_TABLE_KEY, microorganism)
 
         # Get the panel's default breakpoints table
         default_table = None
-        if panel.breakpoints_table:
-            default_table = panel.breakpoints_table[0]
+        if self.panel.breakpoints_table:
+            default_table = self.panel.breakpoints_table[0]
 
         # Update each microorganism-antibiotic with suitable breakpoints table
         update_breakpoint_tables_choices(analysis, default_table=default_table)
         return analysis
 
-    def add_mic_analysis(self, microorganism, antibiotics):
+    def add_mic_analysis(self, microorganism):
         """Updates or creates an analysis for the selection of the Minimum
         Inhibitory Concentration (MIC) value, that allows the introduction of
         '<', '>', '>=' and '<=' operators
         """
-        mic = self.add_ast_analysis(MIC_KEY, microorganism, antibiotics)
+        mic = self.add_ast_analysis(MIC_KEY, microorganism)
         interim_fields = mic.getInterimFields()
         for interim_field in interim_fields:
             interim_field["result_type"] = "fraction"
         mic.setInterimFields(interim_fields)
         return mic
 
-    def add_reporting_analysis(self, microorganism, antibiotics):
+    def add_reporting_analysis(self, microorganism):
         """Creates or updates the selective reporting flag (Y/N) analysis, that
         allows users to specify whether the result for the sensitivity category
         should appear in the final results report
         """
         # add or update the analysis
-        an = self.add_ast_analysis(REPORT_KEY, microorganism, antibiotics)
+        an = self.add_ast_analysis(REPORT_KEY, microorganism)
         # result is made of choices (0:|1:Y|2:N), set "Y" as default
         interim_fields = an.getInterimFields()
         for interim_field in interim_fields:
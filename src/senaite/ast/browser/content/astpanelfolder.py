@@ -30,6 +30,8 @@ from senaite.ast import messageFactory as _
 from bika.lims import api
 from plone.memoize import view
 from senaite.ast.browser.duplicateview import DuplicateView
+from senaite.ast.utils import get_abbreviation
+from senaite.ast.utils import get_antibiotic_brains
 
 
 class ASTPanelFolderView(ListingView):
@@ -50,7 +52,10 @@ class ASTPanelFolderView(ListingView):
         self.context_actions = {
             _c("Add"): {
                 "url": "++add++ASTPanel",
-                "icon": "add.png"}
+                "icon": "add.png"},
+            _("Import"): {
+                "url": "import",
+                "icon": "upload.svg"}
             }
 
         self.show_select_column = True
@@ -78,6 +83,19 @@ class ASTPanelFolderView(ListingView):
             "url": "{}/copy".format(api.get_url(self.context))
         }
 
+        export_transitions = [
+            {
+                "id": "export_csv",
+                "title": _("Export CSV"),
+                "url": "{}/export?format=csv".format(api.get_url(self.context))
+            }, {
+                "id": "export_json",
+                "title": _("Export JSON"),
+                "url": "{}/export?format=json".format(
+                    api.get_url(self.context))
+            },
+        ]
+
         self.review_states = [
             {
                 "id": "default",
@@ -85,20 +103,20 @@ class ASTPanelFolderView(ListingView):
                 "contentFilter": {"is_active": True},
                 "transitions": [],
                 "columns": self.columns.keys(),
-                "custom_transitions": [copy_transition]
+                "custom_transitions": [copy_transition] + export_transitions
             }, {
                 "id": "inactive",
                 "title": _c("Inactive"),
                 "contentFilter": {'is_active': False},
                 "transitions": [],
                 "columns": self.columns.keys(),
-                "custom_transitions": [copy_transition]
+                "custom_transitions": [copy_transition] + export_transitions
             }, {
                 "id": "all",
                 "title": _c("All"),
                 "contentFilter": {},
                 "columns": self.columns.keys(),
-                "custom_transitions": [copy_transition]
+                "custom_transitions": [copy_transition] + export_transitions
             },
         ]
 
@@ -125,7 +143,8 @@ class ASTPanelFolderView(ListingView):
         obj = api.get_object(obj)
 
         # Antibiotic links
-        antibiotics = map(self.get_antibiotic_info, obj.antibiotics)
+        brains = get_antibiotic_brains(obj.antibiotics or [])
+        antibiotics = map(self.get_antibiotic_info, brains)
         links = map(lambda a: a.get("link"), antibiotics)
         item["replace"]["Antibiotics"] = ", ".join(links)
 
@@ -143,13 +162,11 @@ class ASTPanelFolderView(ListingView):
             parent_uid, child_uids=child_uids)
 
     @view.memoize
-    def get_antibiotic_info(self, uid_brain_object):
-        uid = api.get_uid(uid_brain_object)
-        obj = api.get_object(uid_brain_object)
-
-        href = api.get_url(obj)
-        title = api.get_title(obj)
-        abbreviation = obj.abbreviation or title
+    def get_antibiotic_info(self, brain):
+        uid = api.get_uid(brain)
+        href = api.get_url(brain)
+        title = api.get_title(brain)
+        abbreviation = get_abbreviation(brain) or title
 
         return {
             "uid": uid,
@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+import json
+
+from bika.lims import api
+from plone.memoize import view
+from plone.protect import CheckAuthenticator
+from Products.Five.browser import BrowserView
+from Products.Five.browser.pagetemplatefile import ViewPageTemplateFile
+from senaite.ast import messageFactory as _
+from senaite.ast.breakpoints import get_breakpoint_fields
+from senaite.ast.breakpoints import to_breakpoint
+from senaite.ast.breakpoints import to_breakpoint_values
+from senaite.ast.importer import import_breakpoints
+from zope.component import getUtility
+from zope.event import notify
+from zope.interface import implementer
+from zope.lifecycleevent import ObjectModifiedEvent
+from zope.publisher.interfaces import IPublishTraverse
+from zope.schema.interfaces import IVocabularyFactory
+
+# Number of breakpoints returned per page by default
+PAGE_SIZE = 50
+
+# Maximum number of breakpoints returned per page
+MAX_PAGE_SIZE = 500
+
+# Vocabularies of the choice fields of breakpoints, by field name
+VOCABULARIES = (
+    ("antibiotic", "senaite.ast.vocabularies.antibiotics"),
+    ("microorganism", "senaite.ast.vocabularies.species"),
+)
+
+
+class BreakpointsEditorView(BrowserView):
+    """Paged editor of the breakpoints of a BreakpointsTable. Rows are fetched
+    and saved in slices through the breakpoints_api end-point, so tables with
+    thousands of breakpoints do not need to be rendered at once
+    """
+    template = ViewPageTemplateFile("templates/breakpoints_editor.pt")
+
+    def __call__(self):
+        return self.template()
+
+    def get_api_url(self):
+        return "{}/breakpoints_api".format(api.get_url(self.context))
+
+
+class BreakpointsImportView(BrowserView):
+    """Imports the breakpoints of the BreakpointsTable from a CSV or XLSX file
+    and displays the errors found for each row
+    """
+    template = ViewPageTemplateFile("templates/breakpoints_import.pt")
+
+    def __init__(self, context, request):
+        super(BreakpointsImportView, self).__init__(context, request)
+        self.result = None
+
+    def __call__(self):
+        form = self.request.form
+        upload = form.get("file")
+        if form.get("submitted") and upload:
+            CheckAuthenticator(self.request)
+            try:
+                self.result = import_breakpoints(
+                    self.context, upload, upload.filename,
+                    append=bool(form.get("append")),
+                    skip_invalid=bool(form.get("skip_invalid")))
+            except (ImportError, ValueError) as e:
+                self.context.plone_utils.addPortalMessage(str(e), "error")
+                return self.template()
+
+            if self.result["saved"]:
+                message = _("${count} breakpoints imported", mapping={
+                    "count": self.result["imported"]})
+                self.context.plone_utils.addPortalMessage(message, "info")
+            else:
+                message = _("No breakpoints imported, some rows are not valid")
+                self.context.plone_utils.addPortalMessage(message, "error")
+        return self.template()
+
+
+class APIError(Exception):
+    """Error raised when a request to the breakpoints API is not valid
+    """
+
+    def __init__(self, message, status=400):
+        super(APIError, self).__init__(message)
+        self.message = message
+        self.status = status
+
+
+@implementer(IPublishTraverse)
+class BreakpointsAPIView(BrowserView):
+    """JSON end-point for the paged edition of the breakpoints of a
+    BreakpointsTable:
+
+    - vocabularies: returns the choices of antibiotic and microorganism fields
+    - rows: returns a slice of breakpoints, optionally filtered by antibiotic
+      and microorganism UIDs (b_start, b_size, antibiotic, microorganism)
+    - update: applies the changes of the JSON "payload" from the POST, with
+      the keys "update" (list of {"index", "values"}), "add" (list of values)
+      and "delete" (list of indexes). The "stamp" returned with the rows is
+      required, so the changes are only applied if the table was not modified
+      since the rows were fetched
+    """
+
+    def __init__(self, context, request):
+        super(BreakpointsAPIView, self).__init__(context, request)
+        self.traverse_subpath = []
+
+    def publishTraverse(self, request, name):
+        self.traverse_subpath.append(name)
+        return self
+
+    def __call__(self):
+        self.request.response.setHeader("Content-Type", "application/json")
+        action = self.traverse_subpath and self.traverse_subpath[0] or "rows"
+        func = getattr(self, "ajax_{}".format(action), None)
+        if func is None:
+            return self.error("Invalid action: {}".format(action), 404)
+        try:
+            return json.dumps(func())
+        except APIError as e:
+            return self.error(e.message, e.status)
+
+    def error(self, message, status=400):
+        self.request.response.setStatus(status)
+        return json.dumps({"error": message})
+
+    def ajax_vocabularies(self):
+        """Returns the choices of the antibiotic and microorganism fields, as
+        lists of {"value", "title"} dicts
+        """
+        vocabularies = {}
+        for name, vocabulary in VOCABULARIES:
+            terms = self.get_vocabulary(vocabulary)
+            vocabularies[name] = map(lambda term: {
+                "value": term.value,
+                "title": term.title,
+            }, terms)
+        return vocabularies
+
+    def ajax_rows(self):
+        """Returns the slice of breakpoints that match with the filters
+        """
+        form = self.request.form
+        b_start = max(api.to_int(form.get("b_start"), 0), 0)
+        b_size = api.to_int(form.get("b_size"), PAGE_SIZE)
+        b_size = min(max(b_size, 1), MAX_PAGE_SIZE)
+
+        filters = {}
+        for key in ["antibiotic", "microorganism"]:
+            if form.get(key):
+                filters[key] = form.get(key)
+
+        rows = self.get_rows()
+        matches = filter(lambda row: self.matches(row[1], filters),
+                         enumerate(rows))
+        items = map(self.to_item, matches[b_start:b_start + b_size])
+        return {
+            "count": len(rows),
+            "total": len(matches),
+            "b_start": b_start,
+            "b_size": b_size,
+            "stamp": self.get_stamp(),
+            "items": items,
+        }
+
+    def ajax_update(self):
+        """Applies the changes from the POST and returns the updated stamp
+        """
+        if self.request.get("REQUEST_METHOD") != "POST":
+            raise APIError("Method not allowed", 405)
+        CheckAuthenticator(self.request)
+
+        try:
+            payload = json.loads(self.request.form.get("payload") or "{}")
+        except ValueError:
+            raise APIError("Payload is not a valid JSON")
+
+        stamp = payload.get("stamp")
+        if not stamp:
+            raise APIError("Stamp is missing")
+        if stamp != self.get_stamp():
+            raise APIError("The table was modified by someone else", 409)
+
+        rows = map(dict, self.get_rows())
+        count = len(rows)
+
+        def to_index(index):
+            index = api.to_int(index, -1)
+            if index < 0 or index >= count:
+                raise APIError("Invalid row index: {}".format(index))
+            return index
+
+        for change in payload.get("update") or []:
+            index = to_index(change.get("index"))
+            values = self.to_values(change.get("values") or {}, partial=True)
+            rows[index].update(values)
+
+        for values in payload.get("add") or []:
+            rows.append(self.to_values(values))
+
+        deleted = set(map(to_index, payload.get("delete") or []))
+        rows = [row for num, row in enumerate(rows) if num not in deleted]
+
+        self.context.breakpoints = rows
+        self.context.reindexObject()
+        notify(ObjectModifiedEvent(self.context))
+        return {
+            "count": len(rows),
+            "stamp": self.get_stamp(),
+        }
+
+    def get_rows(self):
+        return self.context.breakpoints or []
+
+    def get_stamp(self):
+        """Returns a value that changes each time the table is modified
+        """
+        modified = api.get_modification_date(self.context)
+        return modified and str(modified.micros()) or ""
+
+    @view.memoize
+    def get_vocabulary(self, name):
+        factory = getUtility(IVocabularyFactory, name)
+        return factory(self.context)
+
+    def matches(self, row, filters):
+        """Returns whether the breakpoint row matches with all filters
+        """
+        for key, value in filters.items():
+            if row.get(key) != value:
+                return False
+        return True
+
+    def to_item(self, match):
+        """Returns the JSON-friendly dict of the (index, row) tuple passed-in
+        """
+        index, row = match
+        item = to_breakpoint(row).to_dict()
+        item["index"] = index
+        return item
+
+    @view.memoize
+    def get_fields(self):
+        return get_breakpoint_fields(self.context)
+
+    def to_values(self, values, partial=False):
+        """Returns the values of a breakpoint, converted and validated against
+        the fields of a breakpoint. Raises an APIError if a value is not valid
+        or if a required value is missing, unless partial
+        """
+        try:
+            return to_breakpoint_values(values, self.get_fields(),
+                                        partial=partial)
+        except ValueError as e:
+            raise APIError(str(e))
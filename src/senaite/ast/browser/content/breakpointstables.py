@@ -26,6 +26,7 @@ from bika.lims.catalog import SETUP_CATALOG
 from bika.lims.utils import get_link_for
 from Products.Five.browser.pagetemplatefile import ViewPageTemplateFile
 from senaite.app.listing import ListingView
+from senaite.ast import messageFactory as _
 from senaite.ast.browser.duplicateview import DuplicateView
 
 
@@ -48,6 +49,10 @@ class BreakpointsTablesView(ListingView):
             _c("Add"): {
                 "url": "++add++BreakpointsTable",
                 "icon": "add.png"
+            },
+            _("Import"): {
+                "url": "import",
+                "icon": "upload.svg"
             }
         }
 
@@ -70,6 +75,19 @@ class BreakpointsTablesView(ListingView):
             "url": "{}/copy".format(api.get_url(self.context))
         }
 
+        export_transitions = [
+            {
+                "id": "export_csv",
+                "title": _("Export CSV"),
+                "url": "{}/export?format=csv".format(api.get_url(self.context))
+            }, {
+                "id": "export_json",
+                "title": _("Export JSON"),
+                "url": "{}/export?format=json".format(
+                    api.get_url(self.context))
+            },
+        ]
+
         self.review_states = [
             {
                 "id": "default",
@@ -77,20 +95,20 @@ class BreakpointsTablesView(ListingView):
                 "contentFilter": {"is_active": True},
                 "transitions": [],
                 "columns": self.columns.keys(),
-                "custom_transitions": [copy_transition]
+                "custom_transitions": [copy_transition] + export_transitions
             }, {
                 "id": "inactive",
                 "title": _c("Inactive"),
                 "contentFilter": {'is_active': False},
                 "transitions": [],
                 "columns": self.columns.keys(),
-                "custom_transitions": [copy_transition]
+                "custom_transitions": [copy_transition] + export_transitions
             }, {
                 "id": "all",
                 "title": _c("All"),
                 "contentFilter": {},
                 "columns": self.columns.keys(),
-                "custom_transitions": [copy_transition]
+                "custom_transitions": [copy_transition] + export_transitions
             },
         ]
 
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+from bika.lims import api
+from plone.protect import CheckAuthenticator
+from Products.Five.browser import BrowserView
+from Products.Five.browser.pagetemplatefile import ViewPageTemplateFile
+from senaite.ast import exporter
+from senaite.ast import importer
+from senaite.ast import messageFactory as _
+from senaite.core.catalog import SETUP_CATALOG
+
+# Number of bytes to buffer before they are written to the response
+CHUNK_SIZE = 64 * 1024
+
+# Content types of the supported export formats
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "json": "application/json",
+}
+
+
+class ExportView(BrowserView):
+    """Streams the records of the objects of the context folder, or of the
+    objects selected in the listing, as CSV or JSON. Records are written to
+    the response in chunks, so the export is never built in memory
+    """
+    portal_type = None
+    columns = ()
+    # Function that returns the records to export from the brains passed-in
+    iter_records = None
+
+    def __call__(self):
+        form = self.request.form
+        fmt = form.get("format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            fmt = "csv"
+
+        records = self.iter_records(self.get_brains())
+        if fmt == "csv":
+            chunks = exporter.iter_csv(self.columns, records)
+        else:
+            chunks = exporter.iter_json(records)
+
+        filename = "{}.{}".format(api.get_id(self.context), fmt)
+        response = self.request.response
+        response.setHeader("Content-Type", EXPORT_FORMATS[fmt])
+        response.setHeader("Content-Disposition",
+                           "attachment; filename={}".format(filename))
+
+        buf = []
+        size = 0
+        for chunk in chunks:
+            buf.append(chunk)
+            size += len(chunk)
+            if size >= CHUNK_SIZE:
+                response.write("".join(buf))
+                buf = []
+                size = 0
+        response.write("".join(buf))
+        return ""
+
+    def get_brains(self):
+        """Returns the brains of the objects to export, sorted by title
+        """
+        query = {
+            "portal_type": self.portal_type,
+            "path": {"query": api.get_path(self.context), "depth": 1},
+            "sort_on": "sortable_title",
+            "sort_order": "ascending",
+        }
+        uids = self.request.form.get("uids")
+        if uids:
+            if not isinstance(uids, (list, tuple)):
+                uids = uids.split(",")
+            query["UID"] = filter(api.is_uid, uids)
+        return api.search(query, SETUP_CATALOG)
+
+
+class BreakpointsTablesExportView(ExportView):
+    """Exports the rows of the breakpoints tables
+    """
+    portal_type = "BreakpointsTable"
+    columns = exporter.BREAKPOINTS_TABLE_COLUMNS
+    iter_records = staticmethod(exporter.iter_breakpoints_tables)
+
+
+class ASTPanelsExportView(ExportView):
+    """Exports the configuration of the AST panels
+    """
+    portal_type = "ASTPanel"
+    columns = exporter.AST_PANEL_COLUMNS
+    iter_records = staticmethod(exporter.iter_ast_panels)
+
+
+class ImportView(BrowserView):
+    """Imports the records of a CSV, XLSX or JSON file, as exported by the
+    export view of the context folder, and displays the errors found
+    """
+    template = ViewPageTemplateFile("templates/setup_import.pt")
+    # Function that imports the file into the folder, called with the folder,
+    # the stream and the filename
+    import_file = None
+
+    def __init__(self, context, request):
+        super(ImportView, self).__init__(context, request)
+        self.result = None
+
+    def __call__(self):
+        form = self.request.form
+        upload = form.get("file")
+        if not form.get("submitted") or not upload:
+            return self.template()
+
+        CheckAuthenticator(self.request)
+        try:
+            self.result = self.import_file(self.context, upload,
+                                           upload.filename)
+        except (ImportError, ValueError) as e:
+            self.context.plone_utils.addPortalMessage(str(e), "error")
+            return self.template()
+
+        message = _("${count} items imported", mapping={
+            "count": self.result["imported"]})
+        level = self.result["errors"] and "warning" or "info"
+        self.context.plone_utils.addPortalMessage(message, level)
+        return self.template()
+
+
+class BreakpointsTablesImportView(ImportView):
+    """Imports breakpoints tables
+    """
+    import_file = staticmethod(importer.import_breakpoints_tables)
+
+
+class ASTPanelsImportView(ImportView):
+    """Imports AST panels
+    """
+    import_file = staticmethod(importer.import_ast_panels)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+from bika.lims import api
+from bika.lims.catalog import SETUP_CATALOG
+from Products.Five.browser.pagetemplatefile import ViewPageTemplateFile
+from senaite.ast.browser.addpanel import assign_panel
+from senaite.ast.browser.addpanel import check_submit
+from senaite.ast.interfaces import IASTPanel
+from senaite.core.browser.modals import Modal
+
+
+class AssignPanelModal(Modal):
+    """Modal that allows to assign an AST Panel to the samples selected in a
+    samples listing at once
+    """
+
+    template = ViewPageTemplateFile("templates/assign_panel.pt")
+
+    def __call__(self):
+        self.outcomes = []
+        if self.request.form.get("submitted", False):
+            self.handle_submit()
+        return self.template()
+
+    @property
+    def panels(self):
+        """Returns the active AST Panels, sorted by title ascending
+        """
+        query = {
+            "portal_type": "ASTPanel",
+            "sort_on": "sortable_title",
+            "sort_order": "ascending",
+            "is_active": True,
+        }
+        return api.search(query, SETUP_CATALOG)
+
+    @property
+    def samples(self):
+        """Returns the samples passed-in as UIDs through the request
+        """
+        return filter(api.is_uid, self.uids)
+
+    def handle_submit(self):
+        """Handles the form submit. Assigns the panel selected in the form to
+        all samples passed-in as UIDs through the request
+        """
+        check_submit(self.request)
+        panel = api.get_object(self.request.get("panel_uid"), default=None)
+        if not IASTPanel.providedBy(panel):
+            return
+        self.outcomes = assign_panel(panel, self.samples)
@@ -31,6 +31,7 @@ from senaite.app.listing.view import ListingView
 from senaite.ast import messageFactory as _
 from senaite.ast import utils
 from senaite.ast.config import BREAKPOINTS_TABLE_KEY
+from senaite.ast.config import INVALID_STATES
 from senaite.ast.config import RESISTANCE_KEY
 from senaite.ast.config import ZONE_SIZE_KEY
 
@@ -141,6 +142,8 @@ class ASTPanelView(ListingView):
             analyses = filter(self.can_delete, analyses)
             analyses_ids = map(api.get_id, analyses)
             map(self.context._delObject, analyses_ids)  # noqa
+            utils.invalidate_ast_groups(self.context)
+            utils.invalidate_ast_status(self.context)
 
         else:
             # Update analyses
@@ -177,20 +180,20 @@ class ASTPanelView(ListingView):
         for antibiotic in self.get_antibiotics():
             uid = api.get_uid(antibiotic)
             self.columns[uid] = {
-                "title": antibiotic.abbreviation,
+                "title": utils.get_abbreviation(antibiotic),
                 "type": "boolean",
             }
         self.review_states[0]["columns"] = self.columns.keys()
 
     def folderitem(self, obj, item, index):
-        microorganism = api.get_object(obj)
         item["Microorganism"] = get_link_for(obj, tabindex="-1")
 
-        # Fill the rest of columns (antibiotics)
+        # Fill the rest of columns (antibiotics). The microorganism is not
+        # woken up, cells are read from the microorganism-antibiotic matrix
         abx_uids = filter(lambda c: c != "Microorganism", self.columns.keys())
         for uid in abx_uids:
             antibiotic = self.get_antibiotic(uid)
-            self.render_checkbox(item, microorganism, antibiotic)
+            self.render_checkbox(item, obj, antibiotic)
 
         return item
 
@@ -217,16 +220,42 @@ class ASTPanelView(ListingView):
         """Returns whether all results of AST analyses for the microorganism
         and antibiotic passed in are editable
         """
-        antibiotics = self.get_required_antibiotics(microorganism)
-        return antibiotic not in antibiotics
+        required = self.get_matrix()["required"]
+        key = (api.get_uid(microorganism), api.get_uid(antibiotic))
+        return key not in required
 
     def has_analysis_for(self, microorganism, antibiotic):
         """Returns whether there are ast analyses for this microorganism,
          antibiotic and current context
          """
-        analyses = self.get_analyses_for(microorganism, antibiotic,
-                                         skip_invalid=False)
-        return len(analyses) > 0
+        present = self.get_matrix()["present"]
+        key = (api.get_uid(microorganism), utils.get_abbreviation(antibiotic))
+        return key in present
+
+    @view.memoize
+    def get_matrix(self):
+        """Returns a dict with the microorganism-antibiotic tuples present in
+        the AST analyses of current context ("present"), as tuples of
+        (microorganism uid, antibiotic abbreviation), and those with at least
+        one result that cannot be modified ("required"), as tuples of
+        (microorganism uid, antibiotic uid). Both are built with a single pass
+        over the AST analyses
+        """
+        present = set()
+        required = set()
+        for analysis in self.get_analyses(skip_invalid=False):
+            uid = utils.get_microorganism_uid(analysis)
+            valid = api.get_review_status(analysis) not in INVALID_STATES
+            for interim in analysis.getInterimFields():
+                if not utils.is_extrapolated_interim(interim):
+                    present.add((uid, interim.get("keyword")))
+                if valid and not utils.is_interim_editable(interim):
+                    required.add((uid, interim.get("uid")))
+
+        return {
+            "present": present,
+            "required": required,
+        }
 
     def get_analyses_for(self, microorganism=None, antibiotic=None,
                          skip_invalid=True):
@@ -235,10 +264,11 @@ class ASTPanelView(ListingView):
         """
         ans = self.get_analyses(skip_invalid=skip_invalid)
 
-        # Microorganism name is the ShortTitle
+        # Filter by the UID of the microorganism
         if microorganism:
-            micro_title = api.get_title(microorganism)
-            ans = filter(lambda a: a.getShortTitle() == micro_title, ans)
+            micro_uid = api.get_uid(microorganism)
+            ans = filter(lambda a: utils.get_microorganism_uid(a) == micro_uid,
+                         ans)
 
         # Antibiotic is defined as an interim
         if antibiotic:
@@ -265,7 +295,7 @@ class ASTPanelView(ListingView):
             if utils.is_extrapolated_interim(interim):
                 # Skip extrapolated antibiotics
                 continue
-            if interim.get("keyword") == antibiotic.abbreviation:
+            if interim.get("keyword") == utils.get_abbreviation(antibiotic):
                 return True
         return False
 
@@ -275,13 +305,17 @@ class ASTPanelView(ListingView):
         """
         return api.get_object_by_uid(uid)
 
-    @view.memoize
     def get_antibiotic(self, uid):
-        """Returns the antibiotic object for the given uid
+        """Returns the antibiotic catalog brain for the given uid
+        """
+        return self.get_antibiotics_by_uid()[uid]
+
+    @view.memoize
+    def get_antibiotics_by_uid(self):
+        """Returns a dict of active antibiotic catalog brains by uid
         """
         antibiotics = self.get_antibiotics()
-        antibiotic = filter(lambda a: api.get_uid(a) == uid, antibiotics)
-        return antibiotic[0]
+        return dict(map(lambda abx: (api.get_uid(abx), abx), antibiotics))
 
     @view.memoize
     def get_analyses(self, skip_invalid=False):
@@ -291,8 +325,8 @@ class ASTPanelView(ListingView):
 
     @view.memoize
     def get_antibiotics(self):
-        """Returns the active antibiotics registered in the system, sorted by
-        title ascending
+        """Returns the catalog brains of the active antibiotics registered in
+        the system, sorted by title ascending
         """
         query = {
             "portal_type": "Antibiotic",
@@ -300,8 +334,7 @@ class ASTPanelView(ListingView):
             "sort_on": "sortable_title",
             "sort_order": "ascending",
         }
-        brains = api.search(query, SETUP_CATALOG)
-        return map(api.get_object, brains)
+        return api.search(query, SETUP_CATALOG)
 
     @view.memoize
     def get_microorganisms(self):
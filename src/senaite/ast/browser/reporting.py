@@ -97,7 +97,7 @@ class ASTPanelReportingView(ASTPanelView):
         interim_fields = analysis.getInterimFields()
         for interim in interim_fields:
             keyword = interim.get("keyword")
-            if antibiotic.abbreviation == keyword:
+            if utils.get_abbreviation(antibiotic) == keyword:
                 # choices = "0:|1:Y|2:N"
                 return str(interim.get("value")) == "1"
         return False
@@ -113,11 +113,11 @@ class ASTPanelReportingView(ASTPanelView):
 
     @view.memoize
     def get_antibiotics(self):
-        """Returns the list of antibiotics objects assigned to this sample,
-        sorted by title ascending
+        """Returns the list of antibiotics catalog brains assigned to this
+        sample, sorted by title ascending
         """
         analyses = self.get_analyses(skip_invalid=True)
-        antibiotics = utils.get_antibiotics(analyses)
+        antibiotics = utils.get_antibiotics(analyses, full_objects=False)
         return sorted(antibiotics, key=lambda ab: api.get_title(ab))
 
     def update_analyses(self, microorganism, antibiotics):
@@ -147,7 +147,7 @@ class ASTPanelReportingView(ASTPanelView):
                                           microorganism, all_abx)
 
         # Reporting is true for the given antibiotics
-        selected = map(lambda o: o.abbreviation, antibiotics)
+        selected = map(utils.get_abbreviation, antibiotics)
         for analysis in rep_analyses:
             interim_fields = analysis.getInterimFields()
             for antibiotic in interim_fields:
@@ -18,6 +18,7 @@
 # Copyright 2020-2025 by it's authors.
 # Some rights reserved, see README and LICENSE.
 
+import copy
 import json
 from collections import OrderedDict
 
@@ -32,8 +33,10 @@ from senaite.ast import is_installed
 from senaite.ast import messageFactory as _
 from senaite.ast import utils
 from senaite.ast.config import AST_POINT_OF_CAPTURE
+from senaite.ast.config import AST_RESULTS_MAX_ITEMS
 from senaite.ast.config import IDENTIFICATION_KEY
-from senaite.ast.utils import get_ast_analyses
+from senaite.ast.config import MICROORGANISM_UID_INDEX
+from senaite.ast.utils import get_ast_analyses_brains
 from senaite.ast.i18n import translate as t
 from senaite.core.browser.viewlets.sampleanalyses import LabAnalysesViewlet
 
@@ -59,7 +62,7 @@ class ASTAnalysesViewlet(LabAnalysesViewlet):
             return True
 
         # does this have sensitivity testing analyses?
-        ast_analyses = get_ast_analyses(self.context)
+        ast_analyses = get_ast_analyses_brains(self.context)
         if ast_analyses:
             return True
 
@@ -174,22 +177,91 @@ class ManageResultsView(AnalysesView):
 
     def folder_interim_fields(self, obj, item):
         analysis_obj = self.get_object(obj)
-        for interim_field in analysis_obj.getInterimFields():
-            if utils.is_interim_editable(interim_field):
-                continue
-
-            # Remove this interim field from editable fields
-            keyword = interim_field["keyword"]
-            editable = filter(lambda it: it != keyword, item["allow_edit"])
-            item["allow_edit"] = editable
-
-            # This interim will be displayed as readonly mode, display text
-            text = utils.get_interim_text(interim_field, default="")
-            if interim_field.get("status_rejected", False):
-                icon = get_image('warning.png', title=t(_("Not tested")))
-                text = "{}{}".format(text, icon)
+        state = utils.get_interim_render_state(analysis_obj)
+        if not state:
+            return
+
+        # Remove the read-only interim fields from editable fields
+        readonly = set(map(lambda interim: interim[0], state))
+        editable = filter(lambda it: it not in readonly, item["allow_edit"])
+        item["allow_edit"] = editable
+
+        # These interims will be displayed in readonly mode, display text
+        for keyword, text, rejected in state:
+            if rejected:
+                text = "{}{}".format(text, self.get_not_tested_icon())
             item["replace"][keyword] = text or "&nbsp;"
 
+    @view.memoize
+    def get_not_tested_icon(self):
+        """Returns the icon to display next to antibiotics not tested
+        """
+        return get_image("warning.png", title=t(_("Not tested")))
+
+    def before_render(self):
+        super(ManageResultsView, self).before_render()
+        self.add_microorganism_review_states()
+
+    def add_microorganism_review_states(self):
+        """Adds a filter button for each microorganism, so the analyses of a
+        single microorganism can be loaded at a time. If the number of AST
+        analyses is above AST_RESULTS_MAX_ITEMS, the default button only
+        displays the analyses of the first microorganism and an additional
+        button displays all analyses, including those whose microorganism
+        cannot be resolved
+        """
+        ids = map(lambda review_state: review_state["id"], self.review_states)
+        if any(map(lambda rs_id: rs_id.startswith("microorganism-"), ids)):
+            # Filter buttons added already
+            return
+
+        brains = utils.get_ast_analyses_brains(self.context)
+        uids = map(utils.get_microorganism_uid, brains)
+        uids = OrderedDict.fromkeys(filter(None, uids)).keys()
+        if len(uids) < 2:
+            # Nothing to filter
+            return
+
+        default = filter(lambda rs: rs["id"] == "default", self.review_states)
+        default = default and default[0] or self.review_states[0]
+
+        microorganisms = utils.get_microorganisms(brains)
+        if not microorganisms:
+            # Microorganisms no longer exist, keep the unfiltered default
+            return
+
+        microorganisms = sorted(microorganisms, key=api.get_title)
+        position = self.review_states.index(default) + 1
+        if len(brains) > AST_RESULTS_MAX_ITEMS:
+            # Button to display all analyses, regardless of the microorganism
+            review_state = copy.deepcopy(default)
+            review_state.update({
+                "id": "microorganism-all",
+                "title": _("All"),
+            })
+            self.review_states.insert(position, review_state)
+            position += 1
+
+            # Display the first microorganism only by default
+            first = microorganisms.pop(0)
+            default.update({"title": api.get_title(first)})
+            default.setdefault("contentFilter", {}).update({
+                MICROORGANISM_UID_INDEX: api.get_uid(first),
+            })
+
+        for microorganism in microorganisms:
+            uid = api.get_uid(microorganism)
+            review_state = copy.deepcopy(default)
+            review_state.setdefault("contentFilter", {}).update({
+                MICROORGANISM_UID_INDEX: uid,
+            })
+            review_state.update({
+                "id": "microorganism-{}".format(uid),
+                "title": api.get_title(microorganism),
+            })
+            self.review_states.insert(position, review_state)
+            position += 1
+
     def folderitems(self):
         # This shouldn't be required here, but there are some views that calls
         # directly contents_table() instead of __call__, so before_render is
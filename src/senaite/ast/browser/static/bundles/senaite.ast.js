@@ -226,12 +226,415 @@ ASTPanelAssignController = /*#__PURE__*/function () {
 }();
 
 /* harmony default export */ const astpanelassign_coffee = (ASTPanelAssignController);
+;// CONCATENATED MODULE: ./components/breakpointseditor.coffee
+function breakpointseditor_coffee_classCallCheck(instance, Constructor) { if (!(instance instanceof Constructor)) { throw new TypeError("Cannot call a class as a function"); } }
+
+function breakpointseditor_coffee_defineProperties(target, props) { for (var i = 0; i < props.length; i++) { var descriptor = props[i]; descriptor.enumerable = descriptor.enumerable || false; descriptor.configurable = true; if ("value" in descriptor) descriptor.writable = true; Object.defineProperty(target, descriptor.key, descriptor); } }
+
+function breakpointseditor_coffee_createClass(Constructor, protoProps, staticProps) { if (protoProps) breakpointseditor_coffee_defineProperties(Constructor.prototype, protoProps); if (staticProps) breakpointseditor_coffee_defineProperties(Constructor, staticProps); return Constructor; }
+
+var BreakpointsEditorController;
+
+/*
+Controller for the paged edition of the breakpoints of a BreakpointsTable.
+Choices of antibiotic and species are fetched once, rows are fetched and
+saved in slices through the breakpoints_api end-point
+*/
+BreakpointsEditorController = /*#__PURE__*/function () {
+  function BreakpointsEditorController() {
+    breakpointseditor_coffee_classCallCheck(this, BreakpointsEditorController);
+
+    /*
+    Binds callbacks on elements
+    */
+    this.bind_event_handler = this.bind_event_handler.bind(this);
+    /*
+    Event triggered when the antibiotic or species filter changes
+    */
+    this.on_filter_change = this.on_filter_change.bind(this);
+    /*
+    Event triggered when the value of a breakpoint changes
+    */
+    this.on_value_change = this.on_value_change.bind(this);
+    /*
+    Event triggered when the delete button of a breakpoint is clicked
+    */
+    this.on_delete_click = this.on_delete_click.bind(this);
+    /*
+    Event triggered when the add button is clicked
+    */
+    this.on_add_click = this.on_add_click.bind(this);
+    /*
+    Event triggered when the save button is clicked
+    */
+    this.on_save_click = this.on_save_click.bind(this);
+    this.on_previous_click = this.on_previous_click.bind(this);
+    this.on_next_click = this.on_next_click.bind(this);
+    /*
+    Fetches and renders the current page of breakpoints
+    */
+    this.fetch_rows = this.fetch_rows.bind(this);
+    /*
+    Returns the table row for the breakpoint passed-in
+    */
+    this.render_row = this.render_row.bind(this);
+    /*
+    Returns a select element with the choices of the field passed-in
+    */
+    this.render_select = this.render_select.bind(this);
+    /*
+    Adds the choices of the field passed-in to the filter selector
+    */
+    this.render_filter = this.render_filter.bind(this);
+    /*
+    Returns the html of the options for the field passed-in, built once
+    */
+    this.get_options = this.get_options.bind(this);
+    /*
+    Returns the values of a new breakpoint, with the antibiotic and species
+    preselected in the selects of the row, so they are sent even if the user
+    does not change them
+    */
+    this.get_defaults = this.get_defaults.bind(this);
+    this.reset_changes = this.reset_changes.bind(this);
+    /*
+    Returns whether there are changes pending to be saved
+    */
+    this.has_changes = this.has_changes.bind(this);
+    this.set_status = this.set_status.bind(this);
+    /*
+    Calls the API end-point with a GET
+    */
+    this.ajax_get = this.ajax_get.bind(this);
+    /*
+    Calls the API end-point with a POST
+    */
+    this.ajax_submit = this.ajax_submit.bind(this);
+    /*
+    Returns whether this controller needs to be loaded or not
+    */
+    this.is_required = this.is_required.bind(this);
+    /*
+    Prints a debug message in console with this component name prefixed
+    */
+    this.debug = this.debug.bind(this);
+    this.editor_selector = "div[id=breakpoints_editor]";
+    this.fields = ["mic_s", "mic_r", "disk_content", "diameter_s", "diameter_r"];
+    this.b_size = 50;
+    // Do not load this controller unless required
+    if (!this.is_required()) {
+      return;
+    }
+    this.debug("load");
+    this.editor = external_jQuery_default()(this.editor_selector);
+    this.api_url = this.editor.data("api_url");
+    this.b_start = 0;
+    this.reset_changes();
+    // Bind the event handler to the elements
+    this.bind_event_handler();
+    // Fetch the choices once and then, the first page of rows
+    this.ajax_get("vocabularies").done(function (data) {
+      this.vocabularies = data;
+      this.render_filter("antibiotic");
+      this.render_filter("microorganism");
+      return this.fetch_rows();
+    });
+    return this;
+  }
+
+  breakpointseditor_coffee_createClass(BreakpointsEditorController, [{
+    key: "bind_event_handler",
+    value: function bind_event_handler() {
+      this.debug("bind_event_handler");
+      this.editor.on("change", "select.filter", this.on_filter_change);
+      this.editor.on("change", "tbody :input", this.on_value_change);
+      this.editor.on("click", "button.delete", this.on_delete_click);
+      this.editor.on("click", "button[name=add]", this.on_add_click);
+      this.editor.on("click", "button[name=save]", this.on_save_click);
+      this.editor.on("click", "button[name=previous]", this.on_previous_click);
+      return this.editor.on("click", "button[name=next]", this.on_next_click);
+    }
+  }, {
+    key: "on_filter_change",
+    value: function on_filter_change(event) {
+      this.b_start = 0;
+      return this.fetch_rows();
+    }
+  }, {
+    key: "on_value_change",
+    value: function on_value_change(event) {
+      var base, el, index, name, row;
+      el = external_jQuery_default()(event.currentTarget);
+      row = el.closest("tr");
+      name = el.attr("name");
+      if (row.data("new") != null) {
+        this.changes.add[row.data("new")][name] = el.val();
+      } else {
+        index = row.data("index");
+        if ((base = this.changes.update)[index] == null) {
+          base[index] = {};
+        }
+        this.changes.update[index][name] = el.val();
+      }
+      return this.set_status("Unsaved changes");
+    }
+  }, {
+    key: "on_delete_click",
+    value: function on_delete_click(event) {
+      var row;
+      row = external_jQuery_default()(event.currentTarget).closest("tr");
+      if (row.data("new") != null) {
+        this.changes.add[row.data("new")] = null;
+      } else {
+        this.changes.delete.push(row.data("index"));
+      }
+      row.remove();
+      return this.set_status("Unsaved changes");
+    }
+  }, {
+    key: "on_add_click",
+    value: function on_add_click(event) {
+      var row, values;
+      event.preventDefault();
+      values = this.get_defaults();
+      this.changes.add.push(values);
+      row = this.render_row(values);
+      row.attr("data-new", this.changes.add.length - 1);
+      return this.editor.find("tbody").prepend(row);
+    }
+  }, {
+    key: "on_save_click",
+    value: function on_save_click(event) {
+      var payload;
+      event.preventDefault();
+      payload = {
+        stamp: this.stamp,
+        update: external_jQuery_default().map(this.changes.update, function (values, index) {
+          return {
+            index: index,
+            values: values
+          };
+        }),
+        add: this.changes.add.filter(function (values) {
+          return values != null;
+        }),
+        delete: this.changes.delete
+      };
+      return this.ajax_submit("update", {
+        payload: JSON.stringify(payload)
+      }).done(function (data) {
+        this.reset_changes();
+        this.set_status("Saved");
+        return this.fetch_rows();
+      }).fail(function (xhr) {
+        var ref;
+        return this.set_status(((ref = xhr.responseJSON) != null ? ref.error : void 0) || "Error");
+      });
+    }
+  }, {
+    key: "on_previous_click",
+    value: function on_previous_click(event) {
+      this.b_start = Math.max(this.b_start - this.b_size, 0);
+      return this.fetch_rows();
+    }
+  }, {
+    key: "on_next_click",
+    value: function on_next_click(event) {
+      if (this.b_start + this.b_size >= this.total) {
+        return;
+      }
+      this.b_start += this.b_size;
+      return this.fetch_rows();
+    }
+  }, {
+    key: "fetch_rows",
+    value: function fetch_rows() {
+      var data;
+      data = {
+        b_start: this.b_start,
+        b_size: this.b_size,
+        antibiotic: this.editor.find("select[name=antibiotic]").val(),
+        microorganism: this.editor.find("select[name=microorganism]").val()
+      };
+      return this.ajax_get("rows", data).done(function (data) {
+        var i, item, last, len, ref, tbody;
+        if (!this.has_changes()) {
+          // Keep the stamp the pending changes were made against, so the save is
+          // rejected if the table was modified by someone else in the meantime
+          this.stamp = data.stamp;
+        }
+        this.total = data.total;
+        tbody = this.editor.find("tbody").empty();
+        ref = data.items;
+        for (i = 0, len = ref.length; i < len; i++) {
+          item = ref[i];
+          tbody.append(this.render_row(item).attr("data-index", item.index));
+        }
+        last = Math.min(this.b_start + this.b_size, this.total);
+        return this.editor.find(".page").text(this.b_start + 1 + "-" + last + " / " + this.total);
+      });
+    }
+  }, {
+    key: "render_row",
+    value: function render_row(item) {
+      var button, cell, i, input, j, len, len1, name, ref, ref1, row;
+      row = external_jQuery_default()("<tr/>");
+      ref = ["antibiotic", "microorganism"];
+      for (i = 0, len = ref.length; i < len; i++) {
+        name = ref[i];
+        cell = external_jQuery_default()("<td/>").append(this.render_select(name, item[name]));
+        row.append(cell);
+      }
+      ref1 = this.fields;
+      for (j = 0, len1 = ref1.length; j < len1; j++) {
+        name = ref1[j];
+        input = external_jQuery_default()("<input type='number' step='any' size='5'/>");
+        input.attr("name", name);
+        input.addClass("form-control form-control-sm");
+        input.val(item[name]);
+        row.append(external_jQuery_default()("<td/>").append(input));
+      }
+      button = external_jQuery_default()("<button type='button'>&times;</button>");
+      button.addClass("btn btn-sm btn-link delete");
+      row.append(external_jQuery_default()("<td/>").append(button));
+      return row;
+    }
+  }, {
+    key: "render_select",
+    value: function render_select(name, value) {
+      var select;
+      select = external_jQuery_default()("<select/>");
+      select.attr("name", name);
+      select.addClass("form-control form-control-sm");
+      select.append(this.get_options(name));
+      select.val(value);
+      return select;
+    }
+  }, {
+    key: "render_filter",
+    value: function render_filter(name) {
+      var select;
+      select = this.editor.find("select[name=" + name + "]");
+      select.addClass("filter");
+      return select.append(this.get_options(name));
+    }
+  }, {
+    key: "get_options",
+    value: function get_options(name) {
+      var base;
+      if (this.options == null) {
+        this.options = {};
+      }
+      if ((base = this.options)[name] == null) {
+        base[name] = external_jQuery_default().map(this.vocabularies[name], function (term) {
+          var option;
+          option = external_jQuery_default()("<option/>").attr("value", term.value).text(term.title);
+          return option.prop("outerHTML");
+        }).join("");
+      }
+      return this.options[name];
+    }
+  }, {
+    key: "get_defaults",
+    value: function get_defaults() {
+      var i, len, name, ref, ref1, value, values;
+      values = {};
+      ref = ["antibiotic", "microorganism"];
+      for (i = 0, len = ref.length; i < len; i++) {
+        name = ref[i];
+        value = this.editor.find("select.filter[name=" + name + "]").val();
+        value || (value = (ref1 = this.vocabularies[name][0]) != null ? ref1.value : void 0);
+        if (value != null) {
+          values[name] = value;
+        }
+      }
+      return values;
+    }
+  }, {
+    key: "reset_changes",
+    value: function reset_changes() {
+      return this.changes = {
+        update: {},
+        add: [],
+        delete: []
+      };
+    }
+  }, {
+    key: "has_changes",
+    value: function has_changes() {
+      if (this.changes.delete.length) {
+        return true;
+      }
+      if (this.changes.add.some(function (values) {
+        return values != null;
+      })) {
+        return true;
+      }
+      return !external_jQuery_default().isEmptyObject(this.changes.update);
+    }
+  }, {
+    key: "set_status",
+    value: function set_status(message) {
+      return this.editor.find(".status").text(message);
+    }
+  }, {
+    key: "ajax_get",
+    value: function ajax_get(action) {
+      var data = arguments.length > 1 && arguments[1] !== undefined ? arguments[1] : {};
+
+      var options;
+      this.debug("ajax_get:" + action);
+      options = {
+        url: this.api_url + "/" + action,
+        type: "GET",
+        context: this,
+        dataType: "json",
+        data: data
+      };
+      return external_jQuery_default().ajax(options);
+    }
+  }, {
+    key: "ajax_submit",
+    value: function ajax_submit(action) {
+      var data = arguments.length > 1 && arguments[1] !== undefined ? arguments[1] : {};
+
+      var options;
+      this.debug("ajax_submit:" + action);
+      if (data._authenticator == null) {
+        data._authenticator = external_jQuery_default()("input[name='_authenticator']").val();
+      }
+      options = {
+        url: this.api_url + "/" + action,
+        type: "POST",
+        context: this,
+        dataType: "json",
+        data: data
+      };
+      return external_jQuery_default().ajax(options);
+    }
+  }, {
+    key: "is_required",
+    value: function is_required() {
+      return document.querySelector(this.editor_selector) != null;
+    }
+  }, {
+    key: "debug",
+    value: function debug(message) {
+      return console.debug("[senaite.ast]", "BreakpointsEditorController::" + message);
+    }
+  }]);
+
+  return BreakpointsEditorController;
+}();
+
+/* harmony default export */ const breakpointseditor_coffee = (BreakpointsEditorController);
 ;// CONCATENATED MODULE: ./senaite.ast.js
 
 document.addEventListener("DOMContentLoaded", function () {
   console.debug("*** SENAITE AST JS LOADED ***"); // Initialize controllers
 
   window.ast_panel_assign = new astpanelassign_coffee();
+  window.breakpoints_editor = new breakpointseditor_coffee();
 });
 })();
 
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+
+from bika.lims import api
+from plone.memoize import ram
+from zope.annotation.interfaces import IAnnotations
+from ZODB.utils import z64
+
+# Key of the request annotation where request-scoped values are stored
+REQUEST_CACHE_KEY = "senaite.ast.cache"
+
+
+def get_object_stamp(obj):
+    """Returns a value that changes each time the persistent object passed-in
+    is modified and committed. Returns None if the object has not been
+    committed yet or has pending changes in the current transaction, so the
+    caller can skip caching
+
+    :param obj: persistent object
+    :returns: the serial of the last transaction that modified the object
+    :rtype: str or None
+    """
+    # Wake-up the object, so _p_serial and _p_changed are reliable
+    obj._p_activate()
+    if obj._p_jar is None or obj._p_changed:
+        return None
+    serial = obj._p_serial
+    if serial == z64:
+        return None
+    return serial
+
+
+def object_stamp_cache_key(func, obj, *args, **kwargs):
+    """Cache key for ram-cached functions whose first argument is a persistent
+    object and their result only depends on the persisted state of the object
+    """
+    stamp = get_object_stamp(obj)
+    if stamp is None:
+        raise ram.DontCache
+    return (obj._p_oid, stamp, args, sorted(kwargs.items()))
+
+
+def get_request_cache(name):
+    """Returns the dict with the given name for the storage of values that
+    are only valid during the current request. If there is no request, an
+    empty and non-stored dict is returned
+
+    :param name: name of the cache
+    :type name: str
+    :returns: the request-scoped storage
+    :rtype: dict
+    """
+    request = api.get_request()
+    annotations = IAnnotations(request, None)
+    if annotations is None:
+        return {}
+    storage = annotations.setdefault(REQUEST_CACHE_KEY, {})
+    return storage.setdefault(name, {})
+
+
+def flush_request_cache(name):
+    """Removes all values stored in the request-scoped cache with the given
+    name
+
+    :param name: name of the cache
+    :type name: str
+    """
+    request = api.get_request()
+    annotations = IAnnotations(request, None)
+    if annotations is None:
+        return
+    annotations.get(REQUEST_CACHE_KEY, {}).pop(name, None)
+
+
+def flush_request_caches():
+    """Removes all values stored in the request-scoped caches
+    """
+    request = api.get_request()
+    annotations = IAnnotations(request, None)
+    if annotations is None:
+        return
+    annotations.pop(REQUEST_CACHE_KEY, None)
@@ -30,9 +30,9 @@ from senaite.ast.config import REPORT_EXTRAPOLATED_KEY
 from senaite.ast.config import REPORT_KEY
 from senaite.ast.config import RESISTANCE_KEY
 from senaite.ast.config import ZONE_SIZE_KEY
-from senaite.ast.utils import get_breakpoint
+from senaite.ast.utils import get_breakpoint_record
 from senaite.ast.utils import get_microorganism
-from senaite.ast.utils import get_sensitivity_category
+from senaite.ast.utils import get_sensitivity_categories
 from senaite.ast.utils import get_sensitivity_category_value
 from senaite.ast.utils import is_ast_analysis
 from senaite.ast.utils import is_interim_empty
@@ -43,19 +43,35 @@ from zope.interface import noLongerProvides
 def calc_ast(analysis_brain_uid, default_return='-'):
     """Handles the calculations of AST-like analyses that are triggered when
     results are saved.
+
+    The calculations follow the dependency graph of AST analyses, so only the
+    analyses that depend on the analysis passed-in are recalculated, and only
+    for the antibiotics whose input values changed.
     """
     analysis = api.get_object(analysis_brain_uid)
     if not is_ast_analysis(analysis):
         return default_return
 
-    # Calculate the disk dosages for antibiotics
-    calc_disk_dosages(analysis)
+    # Get the antibiotics whose values changed (None means all)
+    uids = utils.pop_changed_antibiotics(analysis)
 
-    # Calculate the sensitivity categories for antibiotics
-    calc_sensitivity_categories(analysis)
+    # Walk-through the dependency graph, keeping track of the antibiotics that
+    # changed for each analysis, so the calculations downstream are only
+    # triggered when any of their sources changed
+    changed = {analysis.getKeyword(): uids}
+    for target, sources, func in get_calculation_graph():
+        sources = filter(lambda source: source in changed, sources)
+        if not sources:
+            continue
 
-    # Calculate sensitivity categories for extrapolated antibiotics
-    update_extrapolated_antibiotics(analysis)
+        # Antibiotics that changed in any of the sources
+        inputs = reduce(union, map(changed.get, sources))
+        if inputs is not None and not inputs:
+            continue
+
+        # Recalculate and keep track of the antibiotics that changed
+        updated = func(analysis, uids=inputs)
+        changed[target] = union(changed.get(target, set()), updated)
 
     # Update the sensitivity "final" result (for reporting)
     update_sensitivity_result(analysis)
@@ -64,32 +80,82 @@ def calc_ast(analysis_brain_uid, default_return='-'):
     return analysis.getResult() or default_return
 
 
-def calc_sensitivity_categories(analysis):
+def get_calculation_graph():
+    """Returns the dependency graph of AST calculations, sorted topologically.
+    Each item is a tuple (target, sources, function), where target is the
+    keyword of the analysis updated by the function and sources are the
+    keywords of the analyses the target depends on. The sensitivity "final"
+    result is not part of the graph, for it is always rebuilt at the end
+    """
+    return (
+        # Breakpoints table -> Disk content
+        (DISK_CONTENT_KEY, (BREAKPOINTS_TABLE_KEY, ),
+         calc_disk_dosages),
+        # Zone size -> Extrapolated zone sizes
+        (ZONE_SIZE_KEY, (ZONE_SIZE_KEY, ),
+         update_extrapolated_zone_sizes),
+        # Zone size / MIC + Breakpoints table -> Category
+        (RESISTANCE_KEY, (BREAKPOINTS_TABLE_KEY, ZONE_SIZE_KEY, MIC_KEY),
+         calc_sensitivity_categories),
+        # Category -> Extrapolated categories
+        (RESISTANCE_KEY, (RESISTANCE_KEY, ),
+         update_extrapolated_categories),
+        # Report -> Extrapolated report
+        (REPORT_KEY, (REPORT_KEY, ),
+         update_extrapolated_reports),
+    )
+
+
+def union(uids, other):
+    """Returns the union of the two sets of antibiotic uids passed-in. None
+    stands for all antibiotics
+    """
+    if uids is None or other is None:
+        return None
+    return set(uids).union(other)
+
+
+def is_affected(antibiotic, uids):
+    """Returns whether the antibiotic (interim field) passed-in is affected by
+    a change in any of the antibiotics from the uids passed-in, either because
+    it is one of them or because is extrapolated from one of them
+    """
+    if uids is None:
+        return True
+    if antibiotic.get("uid") in uids:
+        return True
+    return antibiotic.get("primary") in uids
+
+
+def calc_sensitivity_categories(analysis, uids=None):
     """Handles the automatic assignment of sensitivity categories (R/I/S) for
     each antibiotic (interim field) assigned to the analysis passed-in.
 
     The input parameters for the calculation are extracted from analyses
     "Zone diameter (mm)" and "Breakpoints table" from same sample and
     microorganism as the analysis passed-in (siblings).
+
+    If uids are provided, only the categories of the antibiotics with these
+    uids are recalculated. Returns the uids of the antibiotics updated
     """
     keyword = analysis.getKeyword()
     if keyword not in [BREAKPOINTS_TABLE_KEY, ZONE_SIZE_KEY, MIC_KEY]:
-        return
+        return set()
 
     # Get the analysis (keyword: analysis) from same sample and microorganism
     analyses = utils.get_ast_group(analysis)
 
     # Extract the analysis that stores the sensitivity category
     sensitivity = analyses.get(RESISTANCE_KEY)
-    if ISubmitted.providedBy(sensitivity):
+    if not sensitivity or ISubmitted.providedBy(sensitivity):
         # Sensitivity category submitted already, nothing to do here!
-        return None
+        return set()
 
     # Extract the counterpart analyses
     breakpoints_analysis = analyses.get(BREAKPOINTS_TABLE_KEY)
     target_analysis = analyses.get(ZONE_SIZE_KEY) or analyses.get(MIC_KEY)
     if not all([breakpoints_analysis, target_analysis]):
-        return None
+        return set()
 
     # Get the method used (MIC or Zone size)
     ast_method = target_analysis.getKeyword()
@@ -108,8 +174,15 @@ def calc_sensitivity_categories(analysis):
     # Get the microorganism this analysis is associated to
     microorganism = get_microorganism(analysis)
 
-    # Update sensitivity category for each antibiotic
+    # Collect the values and breakpoints of the antibiotics to update
+    targets = []
+    target_values = []
+    target_breakpoints = []
     for antibiotic in antibiotics:
+        # Skip antibiotics whose input values did not change
+        if not is_affected(antibiotic, uids):
+            continue
+
         # Skip non-editable antibiotics
         if not utils.is_interim_editable(antibiotic):
             continue
@@ -129,30 +202,45 @@ def calc_sensitivity_categories(analysis):
         breakpoints_uid = breakpoints.get(abx_uid)
 
         # Get the breakpoint for this microorganism and antibiotic
-        breakpoint = get_breakpoint(breakpoints_uid, microorganism, abx_uid)
+        breakpoint = get_breakpoint_record(breakpoints_uid, microorganism,
+                                           abx_uid)
 
-        # Get the sensitivity category (S|I|R) and choice value
-        key = get_sensitivity_category(value, breakpoint, method=ast_method,
-                                       default="")
-        cat = get_sensitivity_category_value(key, default="")
+        targets.append(antibiotic)
+        target_values.append(value)
+        target_breakpoints.append(breakpoint)
+
+    # Get the sensitivity categories (S|I|R) of all antibiotics at once
+    keys = get_sensitivity_categories(target_values, target_breakpoints,
+                                      method=ast_method, default="")
 
-        # Update the sensitivity category
-        antibiotic.update({"value": cat})
+    # Update the sensitivity categories with the choice values
+    updated = set()
+    for antibiotic, key in zip(targets, keys):
+        cat = get_sensitivity_category_value(key, default="")
+        if antibiotic.get("value") != cat:
+            antibiotic.update({"value": cat})
+            updated.add(antibiotic.get("uid"))
 
     # Assign the antibiotics with the updated sensitivity categories
-    sensitivity.setInterimFields(antibiotics)
+    if updated:
+        sensitivity.setInterimFields(antibiotics)
+        utils.mark_updated_analysis(sensitivity)
+    return updated
 
 
-def calc_disk_dosages(analysis):
+def calc_disk_dosages(analysis, uids=None):
     """Handles the automatic assignment of antibiotic dosage for each antibiotic
     (interim field) assigned to the analysis passed-in.
 
     The antibiotic dosage for each diffusion disk is infered from the
     selected breakpoints table, if any.
+
+    If uids are provided, only the dosages of the antibiotics with these uids
+    are recalculated. Returns the uids of the antibiotics updated
     """
     keyword = analysis.getKeyword()
     if keyword not in [BREAKPOINTS_TABLE_KEY]:
-        return
+        return set()
 
     # Get the analysis (keyword: analysis) from same sample and microorganism
     analyses = utils.get_ast_group(analysis)
@@ -161,11 +249,11 @@ def calc_disk_dosages(analysis):
     disk_dosages_analysis = analyses.get(DISK_CONTENT_KEY)
     breakpoints_analysis = analyses.get(BREAKPOINTS_TABLE_KEY)
     if not all([disk_dosages_analysis, breakpoints_analysis]):
-        return None
+        return set()
 
     # Analysis cannot be updated if submitted
     if ISubmitted.providedBy(disk_dosages_analysis):
-        return
+        return set()
 
     # Get the microorganism this analysis is associated to
     microorganism = get_microorganism(analysis)
@@ -175,8 +263,13 @@ def calc_disk_dosages(analysis):
     breakpoints = dict(map(lambda b: (b['uid'], b['value']), breakpoints))
 
     # Dosages are stored as interim fields
+    updated = set()
     antibiotics = disk_dosages_analysis.getInterimFields()
     for antibiotic in antibiotics:
+        # Skip antibiotics whose breakpoints table did not change
+        if not is_affected(antibiotic, uids):
+            continue
+
         # Skip non-editable antibiotics
         if not utils.is_interim_editable(antibiotic):
             continue
@@ -190,72 +283,96 @@ def calc_disk_dosages(analysis):
         breakpoints_uid = breakpoints.get(abx_uid)
 
         # Get the breakpoint for this microorganism and antibiotic
-        breakpoint = get_breakpoint(breakpoints_uid, microorganism, abx_uid)
+        breakpoint = get_breakpoint_record(breakpoints_uid, microorganism,
+                                           abx_uid)
         if not breakpoint:
             continue
 
         # Update the dosage
         breakpoint_dosage = breakpoint.get("disk_content")
-        if api.to_float(breakpoint_dosage, default=0) > 0:
+        if api.to_float(breakpoint_dosage, default=0) <= 0:
+            continue
+        if antibiotic.get("value") != breakpoint_dosage:
             antibiotic.update({"value": breakpoint_dosage})
+            updated.add(antibiotic.get("uid"))
 
     # Assign the inferred disk dosages
-    disk_dosages_analysis.setInterimFields(antibiotics)
-
+    if updated:
+        disk_dosages_analysis.setInterimFields(antibiotics)
+        utils.mark_updated_analysis(disk_dosages_analysis)
+    return updated
 
-def update_extrapolated_antibiotics(analysis):
-    """Updates the sensitivity categories (R/I/S) of extrapolated antibiotics
-    assigned to the analysis passed-in.
 
-    The sensitivity result (category) obtained for a particular antibiotic is
-    extrapolated to extrapolated antibiotics
+def update_extrapolated_zone_sizes(analysis, uids=None):
+    """Updates the zone diameters of extrapolated antibiotics from the same
+    sample and microorganism as the analysis passed-in. Returns the uids of
+    the antibiotics updated
     """
-    keys = [BREAKPOINTS_TABLE_KEY, ZONE_SIZE_KEY, RESISTANCE_KEY, REPORT_KEY]
-    if analysis.getKeyword() not in keys:
-        return
+    target = utils.get_ast_group(analysis).get(ZONE_SIZE_KEY)
+    return update_extrapolated(target, uids=uids)
 
-    def update_extrapolated(target):
-        if ISubmitted.providedBy(target):
-            return
 
-        # Mapping of UID --> interim field
-        interim_fields = target.getInterimFields()
-        uids = dict(map(lambda sen: (sen.get("uid"), sen), interim_fields))
+def update_extrapolated_categories(analysis, uids=None):
+    """Updates the sensitivity categories of extrapolated antibiotics from the
+    same sample and microorganism as the analysis passed-in. Returns the uids
+    of the antibiotics updated
+    """
+    target = utils.get_ast_group(analysis).get(RESISTANCE_KEY)
+    return update_extrapolated(target, uids=uids)
 
-        # Iterate over the interim fields and update extrapolated ones
-        for interim in interim_fields:
-            primary = uids.get(interim.get("primary"))
-            if primary:
-                interim.update({"value": primary.get("value")})
 
-        target.setInterimFields(interim_fields)
+def update_extrapolated_reports(analysis, uids=None):
+    """Updates the reporting criteria (Y/N) of extrapolated antibiotics from
+    the same sample and microorganism as the analysis passed-in. Returns the
+    uids of the antibiotics updated
+    """
+    target = utils.get_ast_group(analysis).get(REPORT_KEY)
+    return update_extrapolated(target, uids=uids)
 
-    # Get the analysis (keyword: analysis) from same sample and microorganism
-    analyses = utils.get_ast_group(analysis)
 
-    # Update the analysis that stores the zone diameter category
-    zone_diameter = analyses.get(ZONE_SIZE_KEY)
-    if zone_diameter:
-        update_extrapolated(zone_diameter)
+def update_extrapolated(target, uids=None):
+    """Assigns the values of the representative antibiotics to the interim
+    fields of the extrapolated antibiotics from the analysis passed-in. If
+    uids are provided, only the antibiotics extrapolated from these are
+    updated. Returns the uids of the antibiotics updated
+    """
+    if not target or ISubmitted.providedBy(target):
+        return set()
 
-    # Update the analysis that stores the sensitivity category
-    sensitivity = analyses.get(RESISTANCE_KEY)
-    if sensitivity:
-        update_extrapolated(sensitivity)
+    # Mapping of UID --> interim field
+    interim_fields = target.getInterimFields()
+    primaries = dict(map(lambda sen: (sen.get("uid"), sen), interim_fields))
 
-    # Update the analysis that stores the reporting criteria (Y/N)
-    reporting = analyses.get(REPORT_KEY)
-    if reporting:
-        update_extrapolated(reporting)
+    # Iterate over the interim fields and update extrapolated ones
+    updated = set()
+    for interim in interim_fields:
+        if not is_affected(interim, uids):
+            continue
+        primary = primaries.get(interim.get("primary"))
+        if not primary:
+            continue
+        value = primary.get("value")
+        if interim.get("value") != value:
+            interim.update({"value": value})
+            updated.add(interim.get("uid"))
+
+    if updated:
+        target.setInterimFields(interim_fields)
+        utils.mark_updated_analysis(target)
+    return updated
 
 
-def update_sensitivity_result(analysis):
+def update_sensitivity_result(analysis, uids=None):
     """Updates the sensitivity "final" result of the sensitivity category
     analysis based on the values set to the AST siblings.
 
     The sensitivity category results for antibiotics of this analysis are
     stored as interim values, while the "final" result of the analysis is a
     list of result options, that is only used for reporting purposes.
+
+    The result is always rebuilt from all antibiotics, so the uids passed-in
+    are not used, but are accepted for consistency with other calculations.
+    Returns an empty set, for there are no antibiotics depending on the result
     """
     # Get the analysis (keyword: analysis) from same sample and microorganism
     analyses = utils.get_ast_group(analysis)
@@ -264,7 +381,7 @@ def update_sensitivity_result(analysis):
     # that are stored as values (R/I/S) for interim fields (antibiotics)
     sensitivity = analyses.get(RESISTANCE_KEY)
     if not sensitivity:
-        return
+        return set()
 
     # Extract the antibiotics (as interim fields) to be reported
     reportable = get_reportable_antibiotics(sensitivity)
@@ -282,18 +399,23 @@ def update_sensitivity_result(analysis):
     options = filter(to_report, options)
 
     # The final result is a list with result option values
-    result = map(lambda o: o.get("ResultValue"), options)
+    result = json.dumps(map(lambda o: o.get("ResultValue"), options))
+    if sensitivity.getResult() == result:
+        # Nothing changed
+        return set()
 
     # No need to keep track of this in audit (this is internal)
     noLongerProvides(sensitivity, IAuditable)
 
     # Set the final result
     capture_date = sensitivity.getResultCaptureDate()
-    sensitivity.setResult(json.dumps(result))
+    sensitivity.setResult(result)
     sensitivity.setResultCaptureDate(capture_date)
+    utils.mark_updated_analysis(sensitivity)
 
     # Re-enable the audit for this analysis
     alsoProvides(sensitivity, IAuditable)
+    return set()
 
 
 def get_reportable_antibiotics(analysis):
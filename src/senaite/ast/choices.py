@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+import threading
+
+# Maximum number of choices strings kept in memory
+MAX_CHOICES_TABLES = 2048
+
+
+class ChoicesTable(object):
+    """Read-only lookup table for the choices subfield of an interim, with the
+    format "<value-0>:<text-0>|<value-1>:<text-1>|...|<value-n>:<text-n>".
+    Tables are shared across callers, so they must not be modified
+    """
+    __slots__ = ("choices", "items", "texts", "values")
+
+    def __init__(self, choices):
+        self.choices = choices
+        items = []
+        if choices:
+            for choice in choices.split("|"):
+                parts = choice.split(":")
+                text = len(parts) > 1 and parts[1] or ""
+                items.append((parts[0], text))
+        # Tuple of (value, text)
+        self.items = tuple(items)
+        # Mapping of value -> text
+        self.texts = dict(items)
+        # Mapping of text -> value
+        self.values = dict(map(lambda item: (item[1], item[0]), items))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __nonzero__(self):
+        return bool(self.items)
+
+    def get_text(self, value, default=None):
+        """Returns the text of the choice with the value passed-in
+        """
+        return self.texts.get(value, default)
+
+    def get_value(self, text, default=None):
+        """Returns the value of the choice with the text passed-in
+        """
+        return self.values.get(text, default)
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def get_choices_table(choices):
+    """Returns the ChoicesTable for the choices string passed-in. Tables are
+    parsed once and kept in memory, so the same instance is returned for
+    equal choices strings
+    """
+    choices = choices or ""
+    table = _tables.get(choices)
+    if table is None:
+        table = ChoicesTable(choices)
+        with _tables_lock:
+            if len(_tables) >= MAX_CHOICES_TABLES:
+                _tables.clear()
+            table = _tables.setdefault(choices, table)
+    return table
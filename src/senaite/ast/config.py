@@ -76,6 +76,29 @@ REPORT_EXTRAPOLATED_KEY = "senaite_ast_report_extrapolated"
 # to assign a final result by its own, without prompting the user
 AST_CALCULATION_TITLE = "senaite_ast_calc"
 
+# Annotation key of AST analyses where the UID of the microorganism the
+# analysis is for is stored. This allows to resolve the microorganism without
+# relying on the ShortTitle of the analysis, that is the microorganism's name
+MICROORGANISM_UID_KEY = "senaite.ast.microorganism_uid"
+
+# Name of the index and metadata column from the analyses catalog that stores
+# the UID of the microorganism AST analyses are for
+MICROORGANISM_UID_INDEX = "getMicroorganismUID"
+
+# Review states of AST analyses that are not considered valid
+INVALID_STATES = ("cancelled", "retracted", "rejected")
+
+# Review states of AST analyses with a result submitted
+SUBMITTED_STATES = ("to_be_verified", "verified", "published")
+
+# Review states of AST analyses with a result verified
+VERIFIED_STATES = ("verified", "published")
+
+# Maximum number of AST analyses displayed at once in the AST results entry
+# listing. Above this number, only the analyses of the first microorganism are
+# loaded by default and the rest are available through the filter buttons
+AST_RESULTS_MAX_ITEMS = 60
+
 # Description for autogenerated contents
 AUTOGENERATED = _(u"Autogenerated by senaite.ast")
 
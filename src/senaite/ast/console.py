@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+import argparse
+
+import transaction
+from AccessControl.SecurityManagement import newSecurityManager
+from AccessControl.SpecialUsers import system
+from bika.lims import api
+from senaite.ast import importer
+from senaite.ast.interfaces import IBreakpointsTable
+from Testing.makerequest import makerequest
+from zope.component.hooks import setSite
+from zope.globalrequest import setRequest
+
+
+def get_site(app, site_id):
+    """Sets up the site with the given id for a console command, with a
+    request and the system user, and returns it
+    """
+    app = makerequest(app)
+    setRequest(app.REQUEST)
+    site = app.unrestrictedTraverse(site_id)
+    setSite(site)
+    newSecurityManager(None, system)
+    return site
+
+
+def import_breakpoints(app, args):
+    """Imports the breakpoints of a CSV or XLSX file into a BreakpointsTable:
+
+        bin/instance import_breakpoints -t <uid or path> <file>
+    """
+    parser = argparse.ArgumentParser(
+        prog="import_breakpoints",
+        description="Imports clinical breakpoints from a CSV or XLSX file")
+    parser.add_argument("filename", help="CSV or XLSX file to import")
+    parser.add_argument("-s", "--site", default="senaite",
+                        help="Id of the site (default: senaite)")
+    parser.add_argument("-t", "--table", required=True,
+                        help="UID or path of the BreakpointsTable")
+    parser.add_argument("-a", "--append", action="store_true",
+                        help="Keep the existing breakpoints of the table")
+    parser.add_argument("--skip-invalid", action="store_true",
+                        help="Import the valid rows if others are not valid")
+    parser.add_argument("-n", "--dry-run", action="store_true",
+                        help="Validate the file without saving")
+    options = parser.parse_args(args)
+
+    site = get_site(app, options.site)
+    table = api.get_object_by_uid(options.table, default=None)
+    if table is None:
+        table = site.unrestrictedTraverse(options.table.strip("/"), None)
+    if not IBreakpointsTable.providedBy(table):
+        parser.error("No BreakpointsTable found: {}".format(options.table))
+
+    with open(options.filename, "rb") as stream:
+        result = importer.import_breakpoints(
+            table, stream, options.filename, append=options.append,
+            skip_invalid=options.skip_invalid)
+
+    for error in result["errors"]:
+        print("Row {row}: {message}".format(**error))
+
+    print("{} breakpoints imported, {} errors".format(
+        result["imported"], len(result["errors"])))
+
+    if options.dry_run or not result["saved"]:
+        transaction.abort()
+        print("Nothing saved")
+        return
+
+    transaction.commit()
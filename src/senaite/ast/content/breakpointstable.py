@@ -19,6 +19,7 @@
 # Some rights reserved, see README and LICENSE.
 
 from plone.dexterity.content import Item
+from senaite.ast.breakpoints import BreakpointsColumns
 from senaite.ast.interfaces import IBreakpointsTable
 from senaite.core.catalog import SETUP_CATALOG
 from zope.interface import implementer
@@ -30,3 +31,24 @@ class BreakpointsTable(Item):
     """
     # Catalogs where this type will be catalogued
     _catalogs = [SETUP_CATALOG]
+
+    # Compact storage of the breakpoints
+    _breakpoints = None
+
+    def _get_breakpoints(self):
+        if self._breakpoints is not None:
+            return self._breakpoints.to_rows()
+        # Breakpoints stored as a list of dicts
+        return self.__dict__.get("breakpoints") or []
+
+    def _set_breakpoints(self, value):
+        try:
+            self._breakpoints = BreakpointsColumns.from_rows(value)
+            self.__dict__.pop("breakpoints", None)
+        except ValueError:
+            # Keep the rows that cannot be stored without loss as they are
+            self._breakpoints = None
+            self.__dict__["breakpoints"] = value
+        self._p_changed = True
+
+    breakpoints = property(_get_breakpoints, _set_breakpoints)
@@ -19,14 +19,13 @@
 # Some rights reserved, see README and LICENSE.
 
 from senaite.ast import logger
-from senaite.ast.config import BREAKPOINTS_TABLE_KEY
-from senaite.ast.config import DISK_CONTENT_KEY
-from senaite.ast.config import RESISTANCE_KEY
-from senaite.ast.config import ZONE_SIZE_KEY
 from senaite.ast.interfaces import IASTAnalysis
 from senaite.ast.utils import get_ast_siblings
 from senaite.ast.utils import is_ast_analysis
 from senaite.ast.utils import is_interim_editable
+from senaite.ast.utils import pop_changed_antibiotics
+from senaite.ast.utils import pop_updated_analyses
+from senaite.ast.utils import set_changed_antibiotics
 from senaite.core.datamanagers import RoutineAnalysisDataManager
 from zope.component import adapter
 
@@ -58,23 +57,29 @@ class ASTAnalysisDataManager(RoutineAnalysisDataManager):
             logger.error("Interim field '{}' not writeable!".format(name))
             return []
 
+        # Keep track of the antibiotic that changed, so the calculation is
+        # only done for this antibiotic and the ones that depend on it
+        if antibiotic:
+            set_changed_antibiotics(self.context, [antibiotic.get("uid")])
+
         # rely on the base class
         base = super(ASTAnalysisDataManager, self)
-        return base.set(name, value)
+        try:
+            return base.set(name, value)
+        finally:
+            # Flush the changes, if not consumed by the calculation already
+            pop_changed_antibiotics(self.context)
 
     def recalculate_results(self, obj, recalculated=None):
         recalculated = super(ASTAnalysisDataManager, self).\
             recalculate_results(obj, recalculated=recalculated)
 
-        if obj.getKeyword() not in [ZONE_SIZE_KEY, BREAKPOINTS_TABLE_KEY]:
+        if not is_ast_analysis(obj):
             return recalculated
 
-        # Add the sensitivity category and disk dosage analysis too, so the
-        # results for this test are automatically refreshed in results entry
-        # listing when the user saves results for either zone size or
-        # breakpoints
-        keep = [RESISTANCE_KEY, DISK_CONTENT_KEY]
+        # Add the siblings updated by the calculation too, so the results for
+        # these tests are automatically refreshed in results entry listing
+        # when the user saves results for either zone size or breakpoints
         siblings = get_ast_siblings(obj)
-        res = filter(lambda s: s.getKeyword() in keep, siblings)
-        recalculated.update(res)
+        recalculated.update(pop_updated_analyses(siblings))
         return recalculated
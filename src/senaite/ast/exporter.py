@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+import csv
+import json
+from StringIO import StringIO
+
+from bika.lims import api
+from senaite.ast.breakpoints import BREAKPOINT_FIELDS
+from senaite.ast.breakpoints import get_breakpoint_records
+from senaite.ast.importer import LIST_SEPARATOR
+from senaite.ast.utils import get_abbreviation
+from senaite.core.catalog import SETUP_CATALOG
+
+# Columns of the records of exported BreakpointsTable rows
+BREAKPOINTS_TABLE_COLUMNS = ("table", ) + BREAKPOINT_FIELDS
+
+# Columns of the records of exported ASTPanel objects
+AST_PANEL_COLUMNS = (
+    "title",
+    "description",
+    "method",
+    "breakpoints_table",
+    "microorganisms",
+    "antibiotics",
+    "disk_content",
+    "zone_size",
+    "mic_value",
+    "selective_reporting",
+)
+
+
+class KeysMap(object):
+    """Maps the UIDs of setup objects to stable keys that do not depend on
+    the site: the abbreviation for antibiotics and the title for the rest.
+    Inactive objects are mapped too, as the lookup maps of the importer
+    resolve them. The map of each portal type is built with a single catalog
+    query
+    """
+
+    def __init__(self):
+        self._keys = {}
+
+    def get_keys(self, portal_type):
+        keys = self._keys.get(portal_type)
+        if keys is None:
+            keys = {}
+            query = {"portal_type": portal_type}
+            for brain in api.search(query, SETUP_CATALOG):
+                key = api.get_title(brain)
+                if portal_type == "Antibiotic":
+                    key = get_abbreviation(brain) or key
+                keys[api.get_uid(brain)] = key
+            self._keys[portal_type] = keys
+        return keys
+
+    def get(self, uid, *portal_types):
+        """Returns the key of the object with the UID passed-in, looked up in
+        the portal types passed-in, in order. Returns the UID if not found
+        """
+        for portal_type in portal_types:
+            key = self.get_keys(portal_type).get(uid)
+            if key:
+                return key
+        return uid
+
+
+def iter_breakpoints_tables(tables, keys=None):
+    """Returns a generator of the records of the rows of the BreakpointsTable
+    objects or brains passed-in, with UIDs resolved to stable keys. Tables are
+    flushed from memory once their rows have been yielded
+    """
+    keys = keys or KeysMap()
+    for table in tables:
+        obj = api.get_object(table)
+        title = api.get_title(obj)
+        for record in get_breakpoint_records(obj):
+            record = record.to_dict()
+            record["table"] = title
+            record["antibiotic"] = keys.get(record["antibiotic"], "Antibiotic")
+            record["microorganism"] = keys.get(
+                record["microorganism"], "Microorganism",
+                "MicroorganismCategory")
+            yield record
+        obj._p_deactivate()
+
+
+def iter_ast_panels(panels, keys=None):
+    """Returns a generator of the records of the ASTPanel objects or brains
+    passed-in, with UIDs resolved to stable keys
+    """
+    keys = keys or KeysMap()
+    for panel in panels:
+        obj = api.get_object(panel)
+        yield {
+            "title": api.get_title(obj),
+            "description": obj.description or "",
+            "method": obj.method,
+            "breakpoints_table": map(
+                lambda uid: keys.get(uid, "BreakpointsTable"),
+                obj.breakpoints_table or []),
+            "microorganisms": map(
+                lambda uid: keys.get(uid, "Microorganism"),
+                obj.microorganisms or []),
+            "antibiotics": map(
+                lambda uid: keys.get(uid, "Antibiotic"),
+                obj.antibiotics or []),
+            "disk_content": bool(obj.disk_content),
+            "zone_size": bool(obj.zone_size),
+            "mic_value": bool(obj.mic_value),
+            "selective_reporting": bool(obj.selective_reporting),
+        }
+        obj._p_deactivate()
+
+
+def to_csv_value(value):
+    """Returns the value passed-in as an utf-8 string for a CSV cell. Lists
+    are joined with the list separator
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return LIST_SEPARATOR.join(map(to_csv_value, value))
+    if isinstance(value, bool):
+        return value and "1" or "0"
+    if isinstance(value, unicode):
+        return value.encode("utf-8")
+    return str(value)
+
+
+def iter_csv(columns, records):
+    """Returns a generator of the lines of a CSV with the columns and records
+    passed-in, header included
+    """
+    buf = StringIO()
+    writer = csv.writer(buf)
+
+    def flush(row):
+        writer.writerow(row)
+        line = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return line
+
+    yield flush(columns)
+    for record in records:
+        yield flush(map(lambda col: to_csv_value(record.get(col)), columns))
+
+
+def iter_json(records):
+    """Returns a generator of the chunks of a JSON list with the records
+    passed-in
+    """
+    yield "["
+    separator = ""
+    for record in records:
+        yield separator + json.dumps(record, sort_keys=True)
+        separator = ",\n"
+    yield "]"
@@ -0,0 +1,553 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+import codecs
+import collections
+import csv
+import json
+import os
+import re
+
+from bika.lims import api
+from Products.CMFPlone.utils import safe_unicode
+from senaite.ast import logger
+from senaite.ast.breakpoints import get_breakpoint_fields
+from senaite.ast.breakpoints import to_breakpoint_values
+from senaite.ast.config import AST_METHODS
+from senaite.ast.config import METHOD_DIFFUSION_DISK_ID
+from senaite.ast.utils import get_abbreviation
+from senaite.core.catalog import SETUP_CATALOG
+from zope.event import notify
+from zope.lifecycleevent import ObjectModifiedEvent
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Column names accepted for each field of a breakpoint, normalized
+COLUMN_ALIASES = {
+    "antibiotic": [
+        "antibiotic", "antimicrobial", "antimicrobial_agent", "agent",
+        "abbreviation",
+    ],
+    "microorganism": [
+        "microorganism", "organism", "species", "category",
+    ],
+    "mic_s": ["mic_s", "mic_breakpoint_s", "mic_s_le"],
+    "mic_r": ["mic_r", "mic_breakpoint_r", "mic_r_gt"],
+    "disk_content": ["disk_content", "disk", "potency"],
+    "diameter_s": ["diameter_s", "zone_diameter_s", "diameter_s_ge"],
+    "diameter_r": ["diameter_r", "zone_diameter_r", "diameter_r_lt"],
+}
+
+# Mapping of normalized column name -> field name
+COLUMNS = dict([(alias, field) for field, aliases in COLUMN_ALIASES.items()
+                for alias in aliases])
+
+# Encoding of the CSV files saved by spreadsheets on Windows, used when the
+# values of a CSV file are not valid in the encoding expected
+FALLBACK_ENCODING = "cp1252"
+
+# Number of bytes read at once from JSON streams
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Whitespace between the tokens of JSON data
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def normalize(value):
+    """Returns the value passed-in lower-cased and stripped, with the words
+    joined by underscores, so it can be used as a lookup key
+    """
+    if value is None:
+        return u""
+    if not isinstance(value, basestring):
+        value = u"{}".format(value)
+    value = safe_unicode(value).strip().lower()
+    return re.sub(r"[^\w]+", "_", value, flags=re.UNICODE).strip("_")
+
+
+def read_csv(stream, encoding="utf-8"):
+    """Returns a generator of lists with the values of each line of the CSV
+    stream passed-in. The delimiter (comma, semicolon or tab) is guessed from
+    the first line. The byte order mark, if any, is discarded and values that
+    are not valid in the encoding passed-in are decoded as cp1252
+    """
+    first = stream.readline()
+    if first.startswith(codecs.BOM_UTF8):
+        first = first[len(codecs.BOM_UTF8):]
+    try:
+        dialect = csv.Sniffer().sniff(first, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    def lines():
+        yield first
+        for line in stream:
+            yield line
+
+    def decode(value):
+        try:
+            return value.decode(encoding)
+        except UnicodeDecodeError:
+            return value.decode(FALLBACK_ENCODING, "replace")
+
+    for row in csv.reader(lines(), dialect):
+        yield map(decode, row)
+
+
+def read_xlsx(stream):
+    """Returns a generator of tuples with the values of each row of the first
+    sheet of the XLSX stream passed-in. Requires openpyxl
+    """
+    if openpyxl is None:
+        raise ImportError("openpyxl is required to import XLSX files")
+
+    workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def read_json(stream, chunk_size=JSON_CHUNK_SIZE):
+    """Returns a generator of the records of the JSON stream passed-in, that
+    must contain a list of objects. The stream is parsed incrementally, so
+    only the chunk being parsed is kept in memory, not the whole file
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(lambda: stream.read(chunk_size), "")
+    buf = ""
+    pos = 0
+    state = "start"
+    while True:
+        pos = JSON_WHITESPACE.match(buf, pos).end()
+        if pos == len(buf):
+            chunk = next(chunks, None)
+            if chunk is None:
+                raise ValueError("Unexpected end of JSON data")
+            buf = buf[pos:] + chunk
+            pos = 0
+            continue
+
+        char = buf[pos]
+        if state == "start":
+            # The opening bracket of the list
+            if char != "[":
+                raise ValueError("A list of records is expected")
+            state = "first"
+            pos += 1
+
+        elif char == "]" and state in ["first", "separator"]:
+            # The closing bracket of the list
+            return
+
+        elif state == "separator":
+            if char != ",":
+                raise ValueError("Invalid JSON data at char {}".format(pos))
+            state = "record"
+            pos += 1
+
+        else:
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                # The record is not complete yet
+                end = None
+            if end is None or end == len(buf):
+                # Read more data, unless there is nothing left to read
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    buf = buf[pos:] + chunk
+                    pos = 0
+                    continue
+                if end is None:
+                    raise ValueError("Invalid JSON data at char {}".format(
+                        pos))
+            state = "separator"
+            pos = end
+            yield record
+
+
+def read_records(stream, filename, columns=None, required=None):
+    """Returns a generator of (line number, record) tuples from the CSV, XLSX
+    or JSON stream passed-in, where record is a dict of field name -> value.
+    The first row of CSV and XLSX files is the header. Columns not known are
+    discarded and empty rows are skipped
+
+    :param stream: file-like object with the contents of the file
+    :param filename: name of the file, used to guess the format
+    :param columns: mapping of normalized column name -> field name. Defaults
+        to the columns of a breakpoint
+    :param required: fields that must be present in the header. Defaults to
+        antibiotic and microorganism
+    """
+    if columns is None:
+        columns = COLUMNS
+    if required is None:
+        required = ["antibiotic", "microorganism"]
+
+    extension = os.path.splitext(filename or "")[-1].lower()
+    if extension == ".json":
+        # Records are objects, so the keys are the header of each row
+        rows = read_json(stream)
+        header = None
+    else:
+        rows = read_xlsx(stream) if extension in [".xlsx", ".xlsm"] \
+            else read_csv(stream)
+        header = next(rows, None) or []
+        header = map(lambda column: columns.get(normalize(column)), header)
+        missing = filter(lambda field: field not in header, required)
+        if missing:
+            raise ValueError("Missing columns: {}".format(", ".join(missing)))
+
+    for num, row in enumerate(rows, start=header is None and 1 or 2):
+        if header is None:
+            row = dict(row)
+            fields = map(lambda key: columns.get(normalize(key)), row.keys())
+            items = zip(fields, row.values())
+        else:
+            items = zip(header, row)
+        record = dict([(field, value) for field, value in items
+                       if field and value not in [None, ""]])
+        if record:
+            yield num, record
+
+
+class LookupMap(object):
+    """Maps the normalized UIDs, titles and any other keys of the objects
+    found by a catalog query to their UIDs. Inactive objects are mapped too,
+    as they are exported, but active objects prevail over inactive ones with
+    the same key. The lookup map is built once with a single catalog query
+    """
+
+    def __init__(self, query, get_keys=None):
+        self.query = query
+        self.get_keys = get_keys
+        self._uids = None
+
+    def get_uids(self):
+        """Returns a dict of normalized key -> (active UIDs, inactive UIDs)
+        """
+        if self._uids is None:
+            self._uids = {}
+            for brain in api.search(self.query, SETUP_CATALOG):
+                uid = api.get_uid(brain)
+                keys = [uid, api.get_title(brain)]
+                if self.get_keys:
+                    keys.extend(self.get_keys(brain))
+                pos = 0 if api.is_active(brain) else 1
+                for key in set(filter(None, map(normalize, keys))):
+                    matches = self._uids.setdefault(key, ([], []))
+                    matches[pos].append(uid)
+        return self._uids
+
+    def get(self, value):
+        """Returns the UID of the object for the value passed-in, if any.
+        Raises a ValueError if the value matches with more than one active
+        object, or with more than one inactive object and no active object
+        """
+        active, inactive = self.get_uids().get(normalize(value), ([], []))
+        uids = active or inactive
+        if len(uids) > 1:
+            value = u"{}".format(value or u"").encode("utf-8")
+            raise ValueError("Ambiguous '{}', matches with {} items".format(
+                value, len(uids)))
+        return uids and uids[0] or None
+
+
+def get_antibiotics_lookup():
+    """Returns the LookupMap of antibiotics by UID, title and abbreviation
+    """
+    query = {"portal_type": "Antibiotic"}
+    return LookupMap(query, lambda brain: [get_abbreviation(brain)])
+
+
+def get_species_lookup():
+    """Returns the LookupMap of microorganisms and microorganism categories by
+    UID and title
+    """
+    query = {"portal_type": ["Microorganism", "MicroorganismCategory"]}
+    return LookupMap(query)
+
+
+class BreakpointsImporter(object):
+    """Converts the records of a CSV or XLSX file to the breakpoints of a
+    BreakpointsTable. Antibiotics and microorganisms are resolved by UID,
+    title or abbreviation with lookup maps built once per importer
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.fields = get_breakpoint_fields(table)
+        self.antibiotics = get_antibiotics_lookup()
+        self.species = get_species_lookup()
+
+    def to_breakpoint(self, record):
+        """Returns the breakpoint values for the record passed-in. Raises a
+        ValueError if the record is not valid
+        """
+        record = dict(record)
+        for key, lookup in [("antibiotic", self.antibiotics),
+                            ("microorganism", self.species)]:
+            value = record.get(key)
+            try:
+                uid = lookup.get(value)
+            except ValueError as e:
+                raise ValueError("{}: {}".format(key, e))
+            if not uid:
+                value = u"{}".format(value or u"").encode("utf-8")
+                raise ValueError("{}: No match for '{}'".format(key, value))
+            record[key] = uid
+        return to_breakpoint_values(record, self.fields)
+
+    def convert(self, records):
+        """Returns a tuple of (breakpoints, errors) for the (line number,
+        record) tuples passed-in, where errors is a list of dicts with the
+        keys "row" and "message"
+        """
+        breakpoints = []
+        errors = []
+        for num, record in records:
+            try:
+                breakpoints.append(self.to_breakpoint(record))
+            except ValueError as e:
+                errors.append({"row": num, "message": str(e)})
+        return breakpoints, errors
+
+
+def import_breakpoints(table, stream, filename, append=False,
+                       skip_invalid=False):
+    """Imports the breakpoints from the CSV or XLSX stream passed-in to the
+    BreakpointsTable. The breakpoints of the table are replaced, unless
+    append. Nothing is stored if any row is not valid, unless skip_invalid
+
+    :param table: the BreakpointsTable to import the breakpoints to
+    :param stream: file-like object with the contents of the file
+    :param filename: name of the file, used to guess the format
+    :param append: whether to keep the existing breakpoints of the table
+    :param skip_invalid: whether to store the valid rows when others are not
+    :returns: dict with the keys "imported", "errors" and "saved"
+    :rtype: dict
+    """
+    records = read_records(stream, filename)
+    breakpoints, errors = BreakpointsImporter(table).convert(records)
+
+    imported = 0
+    saved = not errors or skip_invalid
+    if saved:
+        imported = len(breakpoints)
+        if append:
+            breakpoints = list(table.breakpoints or []) + breakpoints
+        table.breakpoints = breakpoints
+        table.reindexObject()
+        notify(ObjectModifiedEvent(table))
+
+    logger.info("Imported {} breakpoints to {} ({} errors)".format(
+        imported, api.get_path(table), len(errors)))
+
+    return {
+        "imported": imported,
+        "errors": errors,
+        "saved": saved,
+    }
+
+
+# Columns of the records of exported BreakpointsTable rows
+BREAKPOINTS_TABLE_COLUMNS = dict(COLUMNS, table="table", title="table")
+
+# Columns of the records of exported ASTPanel objects
+AST_PANEL_COLUMNS = dict([(name, name) for name in [
+    "title",
+    "description",
+    "method",
+    "breakpoints_table",
+    "microorganisms",
+    "antibiotics",
+    "disk_content",
+    "zone_size",
+    "mic_value",
+    "selective_reporting",
+]])
+
+# Separator of the values of list fields in CSV and XLSX files
+LIST_SEPARATOR = "|"
+
+
+def to_list(value):
+    """Returns the value passed-in as a list. Strings are split by the list
+    separator
+    """
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    if isinstance(value, basestring):
+        return filter(None, map(lambda v: v.strip(),
+                                value.split(LIST_SEPARATOR)))
+    return value is not None and [value] or []
+
+
+def to_bool(value):
+    """Returns the boolean value of the value passed-in. Strings "0", "n",
+    "no", "false" and "off" are False
+    """
+    if isinstance(value, basestring):
+        return normalize(value) not in ["", "0", "n", "no", "false", "off"]
+    return bool(value)
+
+
+def get_or_create(folder, portal_type, title):
+    """Returns the object of the given type with the given title from the
+    folder, if any. Creates a new one otherwise
+    """
+    query = {
+        "portal_type": portal_type,
+        "path": {"query": api.get_path(folder), "depth": 1},
+    }
+    for brain in api.search(query, SETUP_CATALOG):
+        if normalize(api.get_title(brain)) == normalize(title):
+            return api.get_object(brain)
+    return api.create(folder, portal_type, title=title)
+
+
+def import_breakpoints_tables(folder, stream, filename):
+    """Imports the BreakpointsTable rows from the CSV, XLSX or JSON stream
+    passed-in into the folder. Tables are matched by title and created if
+    they do not exist yet. The breakpoints of a table are replaced, unless
+    any of its rows is not valid
+
+    :param folder: the BreakpointsTables folder
+    :param stream: file-like object with the contents of the file
+    :param filename: name of the file, used to guess the format
+    :returns: dict with the keys "imported" and "errors"
+    :rtype: dict
+    """
+    records = read_records(stream, filename,
+                           columns=BREAKPOINTS_TABLE_COLUMNS,
+                           required=["table", "antibiotic", "microorganism"])
+
+    # Rows are grouped by table, so each table is written once
+    tables = collections.OrderedDict()
+    for num, record in records:
+        title = record.pop("table", None)
+        tables.setdefault(title, []).append((num, record))
+
+    imported = 0
+    errors = []
+    for title, table_records in tables.items():
+        if not title:
+            errors.extend(map(lambda rec: {
+                "row": rec[0],
+                "message": "table: Required input is missing",
+            }, table_records))
+            continue
+
+        table = get_or_create(folder, "BreakpointsTable", title)
+        importer = BreakpointsImporter(table)
+        breakpoints, table_errors = importer.convert(table_records)
+        if table_errors:
+            errors.extend(table_errors)
+            continue
+
+        table.breakpoints = breakpoints
+        table.reindexObject()
+        notify(ObjectModifiedEvent(table))
+        imported += 1
+
+    logger.info("Imported {} breakpoints tables ({} errors)".format(
+        imported, len(errors)))
+    return {
+        "imported": imported,
+        "errors": errors,
+    }
+
+
+def import_ast_panels(folder, stream, filename):
+    """Imports the ASTPanel records from the CSV, XLSX or JSON stream
+    passed-in into the folder. Panels are matched by title and created if they
+    do not exist yet. Microorganisms, antibiotics and the breakpoints table
+    are resolved by title or abbreviation
+
+    :param folder: the ASTPanelFolder
+    :param stream: file-like object with the contents of the file
+    :param filename: name of the file, used to guess the format
+    :returns: dict with the keys "imported" and "errors"
+    :rtype: dict
+    """
+    records = read_records(stream, filename, columns=AST_PANEL_COLUMNS,
+                           required=["title"])
+    antibiotics = get_antibiotics_lookup()
+    microorganisms = LookupMap({"portal_type": "Microorganism"})
+    tables = LookupMap({"portal_type": "BreakpointsTable"})
+    methods = map(lambda method: method[0], AST_METHODS)
+
+    def resolve(key, values, lookup):
+        try:
+            uids = map(lookup.get, values)
+        except ValueError as e:
+            raise ValueError("{}: {}".format(key, e))
+        missing = [val for val, uid in zip(values, uids) if not uid]
+        if missing:
+            missing = u", ".join(map(u"{}".format, missing)).encode("utf-8")
+            raise ValueError("{}: No match for '{}'".format(key, missing))
+        return uids
+
+    imported = 0
+    errors = []
+    for num, record in records:
+        try:
+            title = record.get("title")
+            if not title:
+                raise ValueError("title: Required input is missing")
+            values = {
+                "microorganisms": resolve("microorganisms", to_list(
+                    record.get("microorganisms")), microorganisms),
+                "antibiotics": resolve("antibiotics", to_list(
+                    record.get("antibiotics")), antibiotics),
+                "breakpoints_table": resolve("breakpoints_table", to_list(
+                    record.get("breakpoints_table")), tables),
+            }
+            method = record.get("method") or METHOD_DIFFUSION_DISK_ID
+            if method not in methods:
+                raise ValueError("method: No match for '{}'".format(method))
+            values["method"] = method
+        except ValueError as e:
+            errors.append({"row": num, "message": str(e)})
+            continue
+
+        panel = get_or_create(folder, "ASTPanel", title)
+        panel.description = safe_unicode(record.get("description") or u"")
+        for key in ["disk_content", "zone_size", "mic_value",
+                    "selective_reporting"]:
+            if key in record:
+                values[key] = to_bool(record[key])
+        for key, value in values.items():
+            setattr(panel, key, value)
+        panel.reindexObject()
+        notify(ObjectModifiedEvent(panel))
+        imported += 1
+
+    logger.info("Imported {} AST panels ({} errors)".format(
+        imported, len(errors)))
+    return {
+        "imported": imported,
+        "errors": errors,
+    }
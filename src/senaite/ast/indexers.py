@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+from plone.indexer import indexer
+from senaite.abx.interfaces import IAntibiotic
+from senaite.ast.behaviors.abx import IExtrapolatedAntibioticsBehavior
+from senaite.ast.interfaces import IASTAnalysis
+from senaite.ast.utils import get_microorganism_uid
+from senaite.core.interfaces import IAnalysisCatalog
+from senaite.core.interfaces import ISetupCatalog
+from senaite.microorganism.interfaces import IMicroorganism
+
+
+@indexer(IASTAnalysis, IAnalysisCatalog)
+def getMicroorganismUID(instance):  # noqa
+    """Returns the UID of the microorganism the AST analysis is for
+    """
+    return get_microorganism_uid(instance) or ""
+
+
+@indexer(IAntibiotic, ISetupCatalog)
+def abbreviation(instance):
+    """Returns the abbreviation of the antibiotic
+    """
+    return instance.abbreviation or ""
+
+
+@indexer(IAntibiotic, ISetupCatalog)
+def extrapolated_antibiotics(instance):
+    """Returns the UIDs of the antibiotics extrapolated from the antibiotic
+    """
+    behavior = IExtrapolatedAntibioticsBehavior(instance, None)
+    if not behavior:
+        return []
+    try:
+        return list(behavior.extrapolated_antibiotics or [])
+    except TypeError:
+        # Behavior not enabled for this type
+        return []
+
+
+@indexer(IMicroorganism, ISetupCatalog)
+def category_uid(instance):
+    """Returns the UIDs of the categories the microorganism is assigned to
+    """
+    return list(instance.category or [])
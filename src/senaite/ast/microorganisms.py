@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+import threading
+
+import Missing
+from bika.lims import api
+from senaite.core.catalog import SETUP_CATALOG
+
+
+class MicroorganismsIndex(object):
+    """Lookup table of microorganisms by title. The category each
+    microorganism belongs to is read from the category_uid metadata of the
+    brains, so categories are resolved without waking up the objects
+    """
+
+    def __init__(self, brains, counter=None):
+        # Counter of the catalog when the index was built
+        self.counter = counter
+        # Mapping of title -> list of (uid, path)
+        self.titles = {}
+        # Mapping of uid -> path
+        self.paths = {}
+        # Mapping of uid -> category uid
+        self.categories = {}
+        for brain in brains:
+            uid = api.get_uid(brain)
+            path = api.get_path(brain)
+            self.titles.setdefault(api.get_title(brain), []).append(uid)
+            self.paths[uid] = path
+            category = getattr(brain, "category_uid", None)
+            if category is not None and category is not Missing.Value:
+                self.categories[uid] = category and category[0] or ""
+
+    def search(self, titles):
+        """Returns the UIDs of the microorganisms with the titles passed-in
+        """
+        uids = []
+        for title in titles:
+            uids.extend(self.titles.get(title, []))
+        return uids
+
+    def get_object(self, uid):
+        """Returns the microorganism object for the UID passed-in, if any
+        """
+        path = self.paths.get(uid)
+        if not path:
+            return None
+        return api.get_portal().unrestrictedTraverse(path, None)
+
+    def get_category(self, uid):
+        """Returns the UID of the category the microorganism with the UID
+        passed-in belongs to, if any. Returns an empty string otherwise
+        """
+        category = self.categories.get(uid)
+        if category is None:
+            # No metadata for this microorganism yet
+            obj = self.get_object(uid)
+            category = obj and obj.category and obj.category[0] or ""
+            self.categories[uid] = category
+        return category
+
+    def get_categories(self):
+        """Returns a dict with the UIDs of the microorganisms as keys and the
+        UIDs of the categories they belong to as values
+        """
+        return dict(map(lambda uid: (uid, self.get_category(uid)),
+                        self.paths.keys()))
+
+
+_index = {}
+_index_lock = threading.Lock()
+
+
+def get_microorganisms_index():
+    """Returns the up-to-date MicroorganismsIndex. The index is kept in memory
+    and rebuilt only when the setup catalog changes
+    """
+    site = api.get_path(api.get_portal())
+    counter = api.get_tool(SETUP_CATALOG).getCounter()
+    index = _index.get(site)
+    if index and index.counter == counter:
+        return index
+
+    query = {
+        "portal_type": "Microorganism",
+        "sort_on": "sortable_title",
+        "sort_order": "ascending",
+    }
+    brains = api.search(query, SETUP_CATALOG)
+    index = MicroorganismsIndex(brains, counter=counter)
+    with _index_lock:
+        _index[site] = index
+    return index
@@ -29,10 +29,15 @@ from senaite.ast import PROFILE_ID
 from senaite.ast.config import AST_CALCULATION_TITLE
 from senaite.ast.config import AST_POINT_OF_CAPTURE
 from senaite.ast.config import AUTOGENERATED
+from senaite.ast.config import MICROORGANISM_UID_INDEX
 from senaite.ast.config import SERVICE_CATEGORY
 from senaite.ast.config import SERVICES_SETTINGS
 from senaite.ast.permissions import TransitionRejectAntibiotics
+from senaite.ast.utils import get_service
+from senaite.ast.utils import invalidate_services
+from senaite.core.api import catalog as capi
 from senaite.core.api.workflow import update_workflow
+from senaite.core.catalog import ANALYSIS_CATALOG
 from senaite.core.catalog import SETUP_CATALOG
 from senaite.core.workflow import ANALYSIS_WORKFLOW
 from zope.component import getUtility
@@ -50,6 +55,19 @@ BEHAVIORS = [
     ])
 ]
 
+# Tuples of (catalog, index_name, index_type)
+INDEXES = [
+    (ANALYSIS_CATALOG, MICROORGANISM_UID_INDEX, "FieldIndex"),
+]
+
+# Tuples of (catalog, column_name)
+COLUMNS = [
+    (ANALYSIS_CATALOG, MICROORGANISM_UID_INDEX),
+    (SETUP_CATALOG, "abbreviation"),
+    (SETUP_CATALOG, "extrapolated_antibiotics"),
+    (SETUP_CATALOG, "category_uid"),
+]
+
 WORKFLOWS_TO_UPDATE = {
     ANALYSIS_WORKFLOW: {
         "states": {
@@ -101,6 +119,9 @@ def setup_handler(context):
     # Add behaviors
     setup_behaviors(portal)
 
+    # Setup catalog indexes and columns
+    setup_catalogs(portal)
+
     # setup workflows
     setup_workflows(portal)
 
@@ -249,6 +270,10 @@ def setup_ast_services(portal, update_existing=True):
         security.revoke_permission_for(service, ModifyPortalContent, roles)
         service.reindexObject()
 
+    # Flush the services kept in memory and resolve them again
+    invalidate_services()
+    map(get_service, SERVICES_SETTINGS.keys())
+
     logger.info("Setup AST services [DONE]")
 
 
@@ -316,6 +341,27 @@ def search_by_title(container, title):
     return filter(lambda obj: api.get_title(obj) == title, objs)
 
 
+def setup_catalogs(portal):
+    """Adds the indexes and metadata columns to catalogs, if not present yet.
+    Returns the list of tuples (catalog, name) of the indexes and columns
+    that have been added
+    """
+    logger.info("Setup catalogs ...")
+    added = []
+    for cat_name, name, meta_type in INDEXES:
+        if capi.add_index(cat_name, name, meta_type):
+            logger.info("Added index {} to {}".format(name, cat_name))
+            added.append((cat_name, name))
+
+    for cat_name, name in COLUMNS:
+        if capi.add_column(cat_name, name):
+            logger.info("Added column {} to {}".format(name, cat_name))
+            added.append((cat_name, name))
+
+    logger.info("Setup catalogs [DONE]")
+    return added
+
+
 def setup_workflows(portal):
     """Setup workflow changes (status, transitions, permissions, etc.)
     """
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+import time
+
+import transaction
+from bika.lims import api
+from persistent.mapping import PersistentMapping
+from senaite.ast import logger
+from senaite.ast.cache import flush_request_caches
+from senaite.core.upgrade.utils import uncatalog_brain
+from zope.annotation.interfaces import IAnnotations
+
+# Annotation key of the portal where the checkpoints of migrations are stored
+CHECKPOINTS_KEY = "senaite.ast.upgrade.checkpoints"
+
+# Number of objects to process before the transaction is committed
+BATCH_SIZE = 500
+
+# Number of objects to process before the progress is logged
+LOG_EVERY = 100
+
+
+def migrate(name, brains, func, batch_size=BATCH_SIZE, log_every=LOG_EVERY):
+    """Calls func for the object of each brain passed-in, in batches. The
+    transaction is committed and the ZODB cache is garbage collected after
+    each batch, and a checkpoint is stored, so an interrupted migration is
+    resumed from the last committed batch when run again.
+
+    The checkpoint is only used if the number of brains is the same as when
+    the checkpoint was stored, so the query must not depend on the values the
+    migration changes. Objects are processed in the order of the brains and
+    func must be safe to run more than once for the same object.
+
+    :param name: unique name of the migration, used for the checkpoint
+    :param brains: catalog brains of the objects to migrate
+    :param func: function that accepts an object as the single parameter
+    :param batch_size: number of objects to process before commit
+    :param log_every: number of objects to process before progress is logged
+    :returns: the number of objects processed
+    """
+    total = len(brains)
+    start = get_checkpoint(name, total)
+    if start:
+        logger.info("{}: resuming from {}/{}".format(name, start, total))
+
+    # Removed brains shift the position of the remaining brains on next run
+    removed = 0
+    processed = 0
+    started = time.time()
+    for num in range(start, total):
+        done = num - start
+        if done and done % log_every == 0:
+            log_progress(name, num, total, done, started)
+
+        if done and done % batch_size == 0:
+            commit(name, num - removed, total - removed)
+
+        brain = brains[num]
+        try:
+            obj = api.get_object(brain, default=None)
+        except AttributeError:
+            obj = None
+
+        if not obj:
+            uncatalog_brain(brain)
+            removed += 1
+            continue
+
+        func(obj)
+        processed += 1
+
+        # Flush the object from memory
+        obj._p_deactivate()
+
+    remove_checkpoint(name)
+    log_progress(name, total, total, total - start, started)
+    return processed
+
+
+def commit(name, position, total):
+    """Stores the checkpoint for the migration, commits the transaction and
+    garbage collects the ZODB cache. The request-scoped caches are flushed
+    too, so they do not keep references to the objects of the batch
+    """
+    set_checkpoint(name, position, total)
+    transaction.commit()
+    flush_request_caches()
+    api.get_portal()._p_jar.cacheGC()
+    logger.info("{}: commit transaction at {}/{}".format(name, position,
+                                                         total))
+
+
+def log_progress(name, num, total, done, started):
+    """Logs the progress of the migration, with the estimated time left
+    """
+    elapsed = time.time() - started
+    rate = elapsed and done / elapsed or 0
+    eta = rate and (total - num) / rate or 0
+    logger.info("{}: processed objects {}/{} ({:.1f} obj/s, ETA {})".format(
+        name, num, total, rate, format_seconds(eta)))
+
+
+def format_seconds(seconds):
+    """Returns the seconds passed-in in h:mm:ss format
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return "{}:{:02d}:{:02d}".format(hours, minutes, seconds)
+
+
+def get_checkpoints(create=False):
+    """Returns the mapping of migration name -> (position, total) stored in
+    the portal
+    """
+    annotations = IAnnotations(api.get_portal())
+    checkpoints = annotations.get(CHECKPOINTS_KEY)
+    if checkpoints is None and create:
+        checkpoints = PersistentMapping()
+        annotations[CHECKPOINTS_KEY] = checkpoints
+    return checkpoints
+
+
+def get_checkpoint(name, total):
+    """Returns the position where the migration has to be resumed, if any.
+    Returns 0 if there is no checkpoint or the number of objects to migrate
+    changed since the checkpoint was stored
+    """
+    checkpoints = get_checkpoints() or {}
+    position, checkpoint_total = checkpoints.get(name, (0, 0))
+    if checkpoint_total != total:
+        return 0
+    return position
+
+
+def set_checkpoint(name, position, total):
+    """Stores the position of the migration
+    """
+    get_checkpoints(create=True)[name] = (position, total)
+
+
+def remove_checkpoint(name):
+    """Removes the checkpoint of the migration, if any
+    """
+    checkpoints = get_checkpoints()
+    if checkpoints and name in checkpoints:
+        del checkpoints[name]
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of SENAITE.AST.
+#
+# SENAITE.AST is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free
+# Software Foundation, version 2.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc., 51
+# Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+# Copyright 2020-2025 by it's authors.
+# Some rights reserved, see README and LICENSE.
+
+import multiprocessing
+import os
+import time
+
+import transaction
+from AccessControl.SecurityManagement import newSecurityManager
+from AccessControl.SpecialUsers import system
+from App.config import getConfiguration
+from bika.lims import api
+from persistent.mapping import PersistentMapping
+from senaite.ast import logger
+from senaite.ast.upgrade.migration import BATCH_SIZE
+from senaite.ast.upgrade.migration import format_seconds
+from senaite.ast.upgrade.migration import get_checkpoints
+from senaite.ast.upgrade.migration import migrate
+from senaite.ast.upgrade.migration import remove_checkpoint
+from Testing.makerequest import makerequest
+from ZODB.POSException import ConflictError
+from zope.component.hooks import setSite
+from zope.globalrequest import setRequest
+
+# Environment variable with the number of worker processes to use for the
+# migration of AST analyses. Migrations are run sequentially unless greater
+# than 1
+WORKERS_ENV = "SENAITE_AST_UPGRADE_WORKERS"
+
+# Top-level packages of the storages that can be opened by more than one
+# process at once
+SHARED_STORAGES = ("ZEO", "relstorage")
+
+# Options of the storage configuration that set a cache persisted on disk: the
+# persistent client cache of ZEO and the local cache directory of RelStorage.
+# Processes that open the storage with the same options compete for the same
+# files, so the workers open the storage without them
+PERSISTENT_CACHE_OPTIONS = ("client", "cache_local_dir")
+
+# Number of times a batch is retried when a conflict error arises
+MAX_RETRIES = 5
+
+# Seconds to wait before a conflicting batch is retried, multiplied by the
+# number of the attempt
+RETRY_DELAY = 0.5
+
+# Seconds between logs of the aggregate progress
+LOG_INTERVAL = 30
+
+
+def get_workers():
+    """Returns the number of worker processes set for the migrations of AST
+    analyses
+    """
+    try:
+        return int(os.environ.get(WORKERS_ENV) or 0)
+    except ValueError:
+        logger.warn("Invalid value for {}: {}".format(
+            WORKERS_ENV, os.environ.get(WORKERS_ENV)))
+        return 0
+
+
+def is_shared_storage(db):
+    """Returns whether the storage of the database passed-in can be opened by
+    other processes while this one keeps it open, as ZEO and RelStorage do
+    """
+    module = db.storage.__class__.__module__
+    return module.split(".")[0] in SHARED_STORAGES
+
+
+def migrate_parallel(name, brains, func, workers=None, batch_size=BATCH_SIZE):
+    """Calls func for the object of each brain passed-in, with the UIDs split
+    in as many contiguous shards as workers. Each shard is processed in a
+    forked process that opens the database on its own, so the work is spread
+    across CPU cores. Batches are retried when a conflict error arises.
+
+    Workers can only be used with storages that are shared by processes (ZEO
+    or RelStorage). The sequential `migrate` is used instead when the number
+    of workers is not greater than 1 or the storage is not shared.
+
+    Each shard stores its checkpoint in its own persistent object after each
+    batch, so an interrupted migration is resumed from the last committed
+    batch of each shard when run again with the same number of workers.
+
+    Note the transaction of the caller is committed before the workers start,
+    so they can see the changes done so far by the upgrade step. func must not
+    rely on objects loaded by the caller, must be safe to run more than once
+    for the same object and should not reindex objects, for concurrent writes
+    to the catalog end up in conflict errors.
+
+    :param name: unique name of the migration, used for the checkpoints
+    :param brains: catalog brains of the objects to migrate
+    :param func: function that accepts an object as the single parameter
+    :param workers: number of worker processes. Defaults to the value of the
+        SENAITE_AST_UPGRADE_WORKERS environment variable
+    :param batch_size: number of objects to process before commit
+    :returns: the number of objects processed
+    """
+    if workers is None:
+        workers = get_workers()
+    workers = min(workers, len(brains))
+    if workers < 2:
+        return migrate(name, brains, func, batch_size=batch_size)
+
+    portal = api.get_portal()
+    db = portal._p_jar.db()
+    if not is_shared_storage(db):
+        logger.warn("{}: the storage cannot be shared by worker processes, "
+                    "migrating sequentially".format(name))
+        return migrate(name, brains, func, batch_size=batch_size)
+
+    uids = map(api.get_uid, brains)
+    total = len(uids)
+    shards = get_shards(uids, workers)
+
+    # Make the checkpoints and the changes done so far visible to the workers
+    checkpoint_name = "{}:shards".format(name)
+    checkpoints = get_shard_checkpoints(checkpoint_name, shards)
+    transaction.commit()
+
+    # Number of objects processed and position reached by each worker
+    counts = multiprocessing.Array("i", len(shards))
+    positions = multiprocessing.Array("i", len(shards))
+    resumed = 0
+    for num, checkpoint in enumerate(checkpoints):
+        positions[num] = checkpoint["position"]
+        resumed += checkpoint["position"]
+
+    if resumed:
+        logger.info("{}: resuming from {}/{}".format(name, resumed, total))
+    logger.info("{}: migrating {} objects with {} workers".format(
+        name, total, len(shards)))
+
+    processes = []
+    for num, shard in enumerate(shards):
+        worker = ShardWorker(db.database_name, api.get_path(portal), func,
+                             shard, checkpoints[num]._p_oid, num, counts,
+                             positions, batch_size=batch_size)
+        process = multiprocessing.Process(
+            target=worker, name="{}-{}".format(name, num))
+        process.start()
+        processes.append(process)
+
+    started = time.time()
+    while any(map(lambda process: process.is_alive(), processes)):
+        for process in processes:
+            process.join(LOG_INTERVAL)
+            if process.is_alive():
+                break
+        log_throughput(name, sum(positions), total, resumed, started)
+
+    # Objects were changed by other processes
+    portal._p_jar.sync()
+
+    failed = filter(lambda process: process.exitcode != 0, processes)
+    if failed:
+        raise RuntimeError(
+            "{}: {} of {} workers failed, run again to resume".format(
+                name, len(failed), len(processes)))
+
+    remove_checkpoint(checkpoint_name)
+    return sum(counts)
+
+
+def get_shards(uids, workers):
+    """Splits the UIDs passed-in in contiguous shards of the same size, one
+    for each worker. The last shard is smaller when the number of UIDs is not
+    a multiple of the number of workers
+    """
+    total = len(uids)
+    size = total // workers + bool(total % workers)
+    return [uids[pos:pos + size] for pos in range(0, total, size)]
+
+
+def get_shard_checkpoints(name, shards):
+    """Returns the checkpoints of the shards passed-in, a list with a
+    persistent mapping with the position and the total for each shard. The
+    checkpoints are reset unless the number and size of the shards are the
+    same as when they were stored. Each shard has its own persistent object,
+    so workers do not conflict with each other when storing the position
+    """
+    totals = map(len, shards)
+    storage = get_checkpoints(create=True)
+    checkpoints = storage.get(name) or []
+    if map(lambda checkpoint: checkpoint["total"], checkpoints) != totals:
+        checkpoints = map(lambda num: PersistentMapping(
+            position=0, total=num), totals)
+        storage[name] = checkpoints
+    return checkpoints
+
+
+def log_throughput(name, position, total, resumed, started):
+    """Logs the aggregate progress and throughput of the workers
+    """
+    elapsed = time.time() - started
+    rate = elapsed and (position - resumed) / elapsed or 0
+    eta = rate and (total - position) / rate or 0
+    logger.info("{}: processed objects {}/{} ({:.1f} obj/s, ETA {})".format(
+        name, position, total, rate, format_seconds(eta)))
+
+
+class ShardWorker(object):
+    """Processes the objects of a shard of UIDs in a forked process, with its
+    own instance of the database
+    """
+
+    def __init__(self, database_name, path, func, uids, checkpoint_oid, num,
+                 counts, positions, batch_size=BATCH_SIZE):
+        self.database_name = database_name
+        self.path = path
+        self.func = func
+        self.uids = uids
+        self.checkpoint_oid = checkpoint_oid
+        self.num = num
+        self.counts = counts
+        self.positions = positions
+        self.batch_size = batch_size
+
+    def __call__(self):
+        # Forget the connection inherited from the parent process, so the
+        # transactions of this process are not synchronized with it
+        transaction.manager.clearSynchs()
+        transaction.abort()
+
+        # Open the database with a storage of its own
+        config = getConfiguration()
+        factory = config.dbtab.getDatabaseFactory(name=self.database_name)
+        disable_persistent_cache(factory)
+        db = factory.open(self.database_name, {})
+        conn = db.open()
+        try:
+            self.setup_site(conn)
+            checkpoint = conn.get(self.checkpoint_oid)
+            start = checkpoint["position"]
+            for pos in range(start, len(self.uids), self.batch_size):
+                batch = self.uids[pos:pos + self.batch_size]
+                position = pos + len(batch)
+                self.process_batch(batch, checkpoint, position)
+                self.positions[self.num] = position
+                conn.cacheGC()
+        except Exception as e:
+            logger.error("Worker {} failed: {}".format(self.num, repr(e)))
+            raise
+        finally:
+            transaction.abort()
+            conn.close()
+            db.close()
+
+    def process_batch(self, uids, checkpoint, position):
+        """Processes the objects of the UIDs passed-in, stores the position
+        in the checkpoint and commits. The whole batch is retried if a
+        conflict error arises on commit
+        """
+        for attempt in range(1, MAX_RETRIES + 1):
+            transaction.begin()
+            processed = 0
+            try:
+                for uid in uids:
+                    obj = api.get_object_by_uid(uid, default=None)
+                    if not obj:
+                        logger.warn("No object found for UID {}".format(uid))
+                        continue
+                    self.func(obj)
+                    obj._p_deactivate()
+                    processed += 1
+                checkpoint["position"] = position
+                transaction.commit()
+                self.counts[self.num] += processed
+                return
+            except ConflictError:
+                transaction.abort()
+                if attempt == MAX_RETRIES:
+                    raise
+                logger.warn("Worker {}: conflict error, retrying batch "
+                            "({}/{})".format(self.num, attempt, MAX_RETRIES))
+                time.sleep(RETRY_DELAY * attempt)
+
+    def setup_site(self, conn):
+        """Sets the site, a new request and the system user for the
+        connection, so the objects are woken up from it
+        """
+        app = makerequest(conn.root()["Application"])
+        portal = app.unrestrictedTraverse(self.path)
+        setRequest(app.REQUEST)
+        setSite(portal)
+        newSecurityManager(None, system)
+        return portal
+
+
+def disable_persistent_cache(factory):
+    """Removes the options that set a cache persisted on disk from the storage
+    configuration of the database factory passed-in, so the storage is opened
+    with an in-memory cache only. Must only be called from the worker
+    processes, so the configuration of the main process is kept
+    """
+    storage = factory.config.storage.config
+    for option in PERSISTENT_CACHE_OPTIONS:
+        if getattr(storage, option, None):
+            setattr(storage, option, None)
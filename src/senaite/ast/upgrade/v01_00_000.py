@@ -31,6 +31,7 @@ from senaite.ast.setuphandlers import setup_ast_category
 from senaite.ast.setuphandlers import setup_ast_services
 from senaite.ast.setuphandlers import setup_behaviors
 from senaite.ast.setuphandlers import setup_navigation_types
+from senaite.ast.upgrade.migration import migrate
 from senaite.ast.utils import get_result_options
 from senaite.core.catalog import SETUP_CATALOG
 from senaite.core.interfaces import ISampleTemplate
@@ -101,12 +102,8 @@ def fix_uid_ast_interims(portal):
         "sort_order": "ascending",
     }
     analyses = api.search(query, CATALOG_ANALYSIS_LISTING)
-    total = len(analyses)
-    for num, analysis in enumerate(analyses):
-        if num % 100 == 0:
-            logger.info("Fixing antibiotic UIDs in interims: {0}/{1}"
-                        .format(num, total))
-        analysis = api.get_object(analysis)
+
+    def fix_uids(analysis):
         interims = analysis.getInterimFields()
         for interim in interims:
             uid = interim.get("uid")
@@ -121,6 +118,8 @@ def fix_uid_ast_interims(portal):
 
         analysis.setInterimFields(interims)
 
+    migrate("fix_uid_ast_interims", analyses, fix_uids)
+
     logger.info("Fixing antibiotic UIDs in interims [DONE]")
 
 
@@ -199,13 +198,8 @@ def fix_results_options(portal):
         ]
     }
     analyses = api.search(query, CATALOG_ANALYSIS_LISTING)
-    total = len(analyses)
-    for num, analysis in enumerate(analyses):
-        if num % 100 == 0:
-            logger.info("Fixing result options from AST analyses: {0}/{1}"
-                        .format(num, total))
 
-        analysis = api.get_object(analysis)
+    def fix_options(analysis):
         result_options = get_result_options(analysis)
         analysis.setResultOptions(result_options)
         update_sensitivity_result(analysis)
@@ -213,4 +207,6 @@ def fix_results_options(portal):
         # Reindex the object
         analysis.reindexObject()
 
+    migrate("fix_results_options", analyses, fix_options)
+
     logger.info("Fix result options from AST analyses [DONE]")
@@ -28,9 +28,10 @@ from senaite.ast.config import RESISTANCE_KEY
 from senaite.ast.config import SERVICES_SETTINGS
 from senaite.ast.config import ZONE_SIZE_KEY
 from senaite.ast.setuphandlers import setup_ast_services
+from senaite.ast.upgrade.migration import migrate
+from senaite.ast.upgrade.parallel import migrate_parallel
 from senaite.core.catalog import ANALYSIS_CATALOG
 from senaite.core.upgrade import upgradestep
-from senaite.core.upgrade.utils import uncatalog_brain
 from senaite.core.upgrade.utils import UpgradeUtils
 
 version = "1.1.0"
@@ -68,30 +69,15 @@ def fix_wrong_results_resistance(tool):
     }
     brains = api.search(query, ANALYSIS_CATALOG)
 
-    total = len(brains)
-    for num, brain in enumerate(brains):
-        if num and num % 100 == 0:
-            logger.info("Processed objects: {}/{}".format(num, total))
-
-        try:
-            obj = api.get_object(brain, default=None)
-        except AttributeError:
-            obj = None
-
-        if not obj:
-            uncatalog_brain(brain)
-            continue
-
+    def fix_result(obj):
         if obj.getResult() not in ["-", "NA"]:
-            obj._p_deactivate()
-            continue
+            return
 
         # Update the result
         logger.info("Updating {}".format(repr(obj)))
         update_sensitivity_result(obj)
 
-        # Flush the object from memory
-        obj._p_deactivate()
+    migrate("fix_wrong_results_resistance", brains, fix_result)
 
     logger.info("Fix wrong AST results [DONE]")
 
@@ -116,27 +102,16 @@ def setup_mic_fraction_field(tool):
         "getKeyword": [MIC_KEY],
     }
     brains = api.search(query, ANALYSIS_CATALOG)
-    total = len(brains)
-    for num, brain in enumerate(brains):
-        if num and num % 100 == 0:
-            logger.info("Processed objects: {}/{}".format(num, total))
-
-        try:
-            obj = api.get_object(brain, default=None)
-        except AttributeError:
-            obj = None
-
-        if not obj:
-            uncatalog_brain(brain)
-            continue
 
+    def set_fraction_type(obj):
         # Restore the size of all interim fields to 3
         interim_fields = obj.getInterimFields()
         for interim_field in interim_fields:
             interim_field["size"] = "5"
             interim_field["result_type"] = "fraction"
         obj.setInterimFields(interim_fields)
-        obj._p_deactivate()
+
+    migrate_parallel("setup_mic_fraction_field", brains, set_fraction_type)
 
     logger.info("Setup fraction type for MIC value fields [DONE]")
 
@@ -153,20 +128,8 @@ def resize_ast_numeric_fields(tool):
         "getKeyword": [DISK_CONTENT_KEY, ZONE_SIZE_KEY, MIC_KEY],
     }
     brains = api.search(query, ANALYSIS_CATALOG)
-    total = len(brains)
-    for num, brain in enumerate(brains):
-        if num and num % 100 == 0:
-            logger.info("Processed objects: {}/{}".format(num, total))
-
-        try:
-            obj = api.get_object(brain, default=None)
-        except AttributeError:
-            obj = None
-
-        if not obj:
-            uncatalog_brain(brain)
-            continue
 
+    def resize(obj):
         # get the size of the analysis as defined in config
         size = SERVICES_SETTINGS[obj.getKeyword()]["size"]
 
@@ -175,6 +138,7 @@ def resize_ast_numeric_fields(tool):
         for interim_field in interim_fields:
             interim_field["size"] = size
         obj.setInterimFields(interim_fields)
-        obj._p_deactivate()
+
+    migrate_parallel("resize_ast_numeric_fields", brains, resize)
 
     logger.info("Resizing AST numeric fields ...")
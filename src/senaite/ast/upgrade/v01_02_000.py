@@ -25,6 +25,7 @@ from senaite.ast.config import AST_POINT_OF_CAPTURE
 from senaite.ast.config import SERVICES_SETTINGS
 from senaite.ast.setuphandlers import revoke_edition_permissions
 from senaite.ast.setuphandlers import setup_workflows
+from senaite.ast.upgrade.migration import migrate
 from senaite.core.catalog import ANALYSIS_CATALOG
 from senaite.core.catalog import SETUP_CATALOG
 from senaite.core.upgrade import upgradestep
@@ -71,7 +72,7 @@ def setup_reject_antibiotics(tool):
     cat = api.get_tool(ANALYSIS_CATALOG)
     brains = cat(portal_type="Analysis", review_state=statuses,
                  getPointOfCapture=AST_POINT_OF_CAPTURE)
-    map(update_role_mappings_for, brains)
+    migrate("setup_reject_antibiotics", brains, update_role_mappings_for)
 
     logger.info("Setup reject antibiotics transition [DONE]")
 
@@ -18,8 +18,17 @@
 # Copyright 2020-2025 by it's authors.
 # Some rights reserved, see README and LICENSE.
 
+from bika.lims import api
 from senaite.ast import logger
 from senaite.ast import PRODUCT_NAME
+from senaite.ast.config import AST_POINT_OF_CAPTURE
+from senaite.ast.config import MICROORGANISM_UID_INDEX
+from senaite.ast.setuphandlers import setup_catalogs
+from senaite.ast.upgrade.migration import migrate
+from senaite.ast.utils import get_microorganism
+from senaite.ast.utils import set_microorganism
+from senaite.core.catalog import ANALYSIS_CATALOG
+from senaite.core.catalog import SETUP_CATALOG
 from senaite.core.upgrade import upgradestep
 from senaite.core.upgrade.utils import UpgradeUtils
 
@@ -45,3 +54,103 @@ def upgrade(tool):
 
     logger.info("{0} upgraded to version {1}".format(PRODUCT_NAME, version))
     return True
+
+
+def setup_microorganism_uid(tool):
+    """Adds the index and metadata column for the UID of the microorganism to
+    the analyses catalog and stores the UID of the microorganism in existing
+    AST analyses, resolved from their ShortTitle
+    """
+    logger.info("Setup microorganism UID for AST analyses ...")
+    portal = tool.aq_inner.aq_parent
+    setup_catalogs(portal)
+
+    query = {
+        "portal_type": "Analysis",
+        "getPointOfCapture": AST_POINT_OF_CAPTURE,
+    }
+    brains = api.search(query, ANALYSIS_CATALOG)
+
+    def set_microorganism_uid(obj):
+        # Store the microorganism, resolved from the ShortTitle
+        microorganism = get_microorganism(obj)
+        set_microorganism(obj, microorganism)
+        obj.reindexObject(idxs=[MICROORGANISM_UID_INDEX])
+
+    # Objects are reindexed, so they are migrated sequentially to prevent
+    # conflicts on the catalog
+    migrate("setup_microorganism_uid", brains, set_microorganism_uid)
+    logger.info("Setup microorganism UID for AST analyses [DONE]")
+
+
+def setup_antibiotics_metadata(tool):
+    """Adds the metadata columns for the abbreviation and the extrapolated
+    antibiotics to the setup catalog and reindexes the antibiotics
+    """
+    logger.info("Setup metadata of antibiotics ...")
+    portal = tool.aq_inner.aq_parent
+    setup_catalogs(portal)
+
+    brains = api.search({"portal_type": "Antibiotic"}, SETUP_CATALOG)
+    catalog = api.get_tool(SETUP_CATALOG)
+
+    def update_metadata(obj):
+        # Update the metadata only, along with the cheap UID index
+        catalog.catalog_object(obj, update_metadata=1, idxs=["UID"])
+
+    migrate("setup_antibiotics_metadata", brains, update_metadata)
+    logger.info("Setup metadata of antibiotics [DONE]")
+
+
+def setup_microorganisms_metadata(tool):
+    """Adds the metadata column for the category of microorganisms to the
+    setup catalog and reindexes the microorganisms
+    """
+    logger.info("Setup metadata of microorganisms ...")
+    portal = tool.aq_inner.aq_parent
+    setup_catalogs(portal)
+
+    brains = api.search({"portal_type": "Microorganism"}, SETUP_CATALOG)
+    catalog = api.get_tool(SETUP_CATALOG)
+
+    def update_metadata(obj):
+        # Update the metadata only, along with the cheap UID index
+        catalog.catalog_object(obj, update_metadata=1, idxs=["UID"])
+
+    migrate("setup_microorganisms_metadata", brains, update_metadata)
+    logger.info("Setup metadata of microorganisms [DONE]")
+
+
+def setup_compact_breakpoints(tool):
+    """Converts the breakpoints of BreakpointsTable objects from lists of
+    dicts to the compact columnar storage. Tables with rows that cannot be
+    stored without loss are kept as they are
+    """
+    logger.info("Setup compact storage of breakpoints ...")
+    query = {"portal_type": "BreakpointsTable"}
+    brains = api.search(query, SETUP_CATALOG)
+
+    def to_compact(obj):
+        # Wake-up the object, so its __dict__ is loaded
+        obj._p_activate()
+        if "breakpoints" not in obj.__dict__:
+            # Already migrated or without breakpoints
+            return
+        obj.breakpoints = obj.__dict__["breakpoints"]
+        if obj._breakpoints is None:
+            logger.warn("Cannot convert breakpoints of {}".format(
+                api.get_path(obj)))
+
+    migrate("setup_compact_breakpoints", brains, to_compact)
+    logger.info("Setup compact storage of breakpoints [DONE]")
+
+
+def setup_breakpoints_table_actions(tool):
+    """Adds the actions for the paged editor and the import of breakpoints to
+    the type information of BreakpointsTable
+    """
+    logger.info("Setup actions of breakpoints tables ...")
+    portal = tool.aq_inner.aq_parent
+    setup = portal.portal_setup
+    setup.runImportStepFromProfile(profile, "typeinfo")
+    logger.info("Setup actions of breakpoints tables [DONE]")
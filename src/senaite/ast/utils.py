@@ -23,6 +23,8 @@ import copy
 import collections
 import itertools
 import json
+import threading
+from array import array
 from bika.lims import api
 from bika.lims.catalog import SETUP_CATALOG
 from bika.lims.interfaces import IInternalUse
@@ -31,41 +33,104 @@ from bika.lims.interfaces import IVerified
 from bika.lims.utils import changeWorkflowState
 from bika.lims.utils.analysis import create_analysis
 from bika.lims.workflow import doActionFor
+from plone.memoize import ram
 from senaite.ast import logger
 from senaite.ast import messageFactory as _
+from senaite.ast.breakpoints import get_breakpoints_index
+from senaite.ast.breakpoints import get_breakpoints_tables_index
+from senaite.ast.breakpoints import get_thresholds
+from senaite.ast.breakpoints import THRESHOLD_FIELDS
+from senaite.ast.cache import get_request_cache
+from senaite.ast.cache import object_stamp_cache_key
+from senaite.ast.choices import get_choices_table
 from senaite.ast.config import AST_POINT_OF_CAPTURE
 from senaite.ast.config import BREAKPOINTS_TABLE_KEY
 from senaite.ast.config import IDENTIFICATION_KEY
+from senaite.ast.config import INVALID_STATES
 from senaite.ast.config import MIC_KEY
+from senaite.ast.config import MICROORGANISM_UID_INDEX
+from senaite.ast.config import MICROORGANISM_UID_KEY
 from senaite.ast.config import REPORT_EXTRAPOLATED_KEY
 from senaite.ast.config import REPORT_KEY
 from senaite.ast.config import RESISTANCE_KEY
 from senaite.ast.config import SERVICES_SETTINGS
 from senaite.ast.config import ZONE_SIZE_KEY
 from senaite.ast.interfaces import IASTAnalysis
-from senaite.core.p3compat import cmp
+from senaite.ast.microorganisms import get_microorganisms_index
 from senaite.core.workflow import ANALYSIS_WORKFLOW
+from zope.annotation.interfaces import IAnnotations
 from zope.interface import alsoProvides
 from zope.interface import noLongerProvides
 
 _marker = object()
 
+# Mapping of site path -> {service keyword: (uid, path)}
+_services = {}
+_services_lock = threading.Lock()
+
 
 def get_service(keyword, default=_marker):
-    """Returns the Analysis Service for the given keyword, if any
+    """Returns the Analysis Service for the given keyword, if any. The UIDs
+    and paths of the services are kept in memory, so services are resolved
+    by traversal, without the need of searching the catalog
     """
+    site = api.get_path(api.get_portal())
+    services = _services.get(site) or {}
+    service = get_service_by_path(*services.get(keyword, (None, None)))
+    if service and service.getKeyword() == keyword:
+        return service
+
+    # Resolve the AST services and this one at once and keep them in memory
+    keywords = set(SERVICES_SETTINGS.keys())
+    keywords.add(keyword)
     query = {
         "portal_type": "AnalysisService",
-        "getKeyword": keyword
+        "getKeyword": list(keywords),
     }
-    brains = api.search(query, SETUP_CATALOG)
-    if len(brains) == 1:
-        return api.get_object(brains[0])
+    found = collections.defaultdict(list)
+    for brain in api.search(query, SETUP_CATALOG):
+        obj = api.get_object(brain)
+        found[obj.getKeyword()].append(obj)
+
+    services = dict(services)
+    for key in keywords:
+        objs = found.get(key, [])
+        if len(objs) == 1:
+            services[key] = (api.get_uid(objs[0]), api.get_path(objs[0]))
+        else:
+            services.pop(key, None)
+
+    with _services_lock:
+        _services[site] = services
+
+    objs = found.get(keyword, [])
+    if len(objs) == 1:
+        return objs[0]
     elif default is _marker:
         raise KeyError("No service found for '{}'".format(keyword))
     return default
 
 
+def get_service_by_path(uid, path):
+    """Returns the service at the given path, but only if its UID matches with
+    the one passed-in. Returns None otherwise
+    """
+    if not path:
+        return None
+    service = api.get_portal().unrestrictedTraverse(path, None)
+    if not service or api.get_uid(service) != uid:
+        return None
+    return service
+
+
+def invalidate_services():
+    """Flushes the UIDs and paths of the services kept in memory, so they are
+    resolved again from the catalog on next access
+    """
+    with _services_lock:
+        _services.clear()
+
+
 def new_analysis_id(sample, analysis_keyword):
     """Returns a new analysis id for an eventual new test with given keyword
     to prevent clashes with ids of other analyses from same sample
@@ -90,14 +155,16 @@ def create_ast_analyses(sample, keywords, microorganism, antibiotics):
     return output
 
 
-def create_ast_analysis(sample, keyword, microorganism, antibiotics):
-    """Creates a new AST analysis
+def create_ast_analysis(sample, keyword, microorganism, antibiotics,
+                        service=None):
+    """Creates a new AST analysis. If no service is passed-in, the service is
+    resolved from the keyword
     """
     # Create a new ID to prevent clashes
     new_id = new_analysis_id(sample, keyword)
 
     # Create the analysis
-    service = get_service(keyword)
+    service = service or get_service(keyword)
     analysis = create_analysis(sample, service, id=new_id)
 
     # Assign the name of the microorganism as the title
@@ -105,6 +172,7 @@ def create_ast_analysis(sample, keyword, microorganism, antibiotics):
     short_title = api.get_title(microorganism)
     analysis.setTitle(title)
     analysis.setShortTitle(short_title)
+    set_microorganism(analysis, microorganism)
 
     # Apply the interface markers
     alsoProvides(analysis, IASTAnalysis)
@@ -119,6 +187,8 @@ def create_ast_analysis(sample, keyword, microorganism, antibiotics):
     # Initialize the analysis and reindex
     doActionFor(analysis, "initialize")
     analysis.reindexObject()
+    invalidate_ast_groups(sample)
+    update_ast_status(analysis)
 
     # Set the default result to '-' so user can directly save without the
     # need of manually confirming each interim field value on result entry
@@ -142,15 +212,17 @@ def set_antibiotics(analysis, antibiotics, purge=False):
 
     # Extract the antibiotic uids
     uids = filter(None, map(get_uid, antibiotics))
+    selected_uids = set(uids)
 
     # Extract the interim fields (antibiotics) from the analysis
     interim_fields = copy.deepcopy(analysis.getInterimFields()) or []
     if purge:
-        interim_fields = filter(lambda i: i["uid"] in uids, interim_fields)
+        interim_fields = filter(lambda i: i["uid"] in selected_uids,
+                                interim_fields)
 
     # Extend with the antibiotics that are missing
     keyword = analysis.getKeyword()
-    present_uids = filter(None, map(get_uid, interim_fields))
+    present_uids = set(filter(None, map(get_uid, interim_fields)))
     missing_uids = filter(lambda i: i not in present_uids, uids)
     missing_interims = map(lambda ab: to_interim(keyword, ab), missing_uids)
     interim_fields.extend(missing_interims)
@@ -169,14 +241,7 @@ def update_ast_analysis(analysis, antibiotics, purge=False):
 
     # Re-sort antibiotics passed-in to follow same order as the original ones
     original = get_antibiotics(analysis, uids_only=True)
-
-    def sort_antibiotics(a, b):
-        def get_idx(abx):
-            uid = api.get_uid(abx)
-            return original.index(uid) if uid in original else len(original)
-        return cmp(get_idx(a), get_idx(b))
-
-    antibiotics = sorted(antibiotics, cmp=sort_antibiotics)
+    antibiotics = sort_by_position(antibiotics, original)
 
     # Re-assign the antibiotics
     set_antibiotics(analysis, antibiotics, purge=purge)
@@ -186,6 +251,8 @@ def update_ast_analysis(analysis, antibiotics, purge=False):
     if purge and not interim_fields:
         sample = analysis.getRequest()
         sample._delObject(api.get_id(analysis))
+        invalidate_ast_groups(sample)
+        invalidate_ast_status(sample)
         return
 
     # Extend with extrapolated antibiotics
@@ -220,6 +287,9 @@ def update_ast_analysis(analysis, antibiotics, purge=False):
         prev_status = get_prev_status(analysis, skip=to_skip)
         changeWorkflowState(analysis, ANALYSIS_WORKFLOW, prev_status)
 
+    # The analysis is pending again for the sample guards
+    update_ast_status(analysis)
+
     # If the sample is in to_be_verified status, try to rollback
     sample = analysis.getRequest()
     doActionFor(sample, "rollback")
@@ -228,6 +298,33 @@ def update_ast_analysis(analysis, antibiotics, purge=False):
     analysis.reindexObject()
 
 
+def sort_by_position(antibiotics, uids):
+    """Returns the antibiotics passed-in sorted in the same order as the uids.
+    Antibiotics not present in uids are placed at the end, keeping their
+    relative order
+
+    :param antibiotics: antibiotics to sort
+    :type antibiotics: list of Antibiotic objects or UIDs
+    :param uids: antibiotic UIDs that define the sort order
+    :type uids: list of UIDs
+    :returns: the sorted antibiotics
+    :rtype: list
+    """
+    # Mapping of uid -> position (first occurrence prevails)
+    positions = {}
+    for position, uid in enumerate(uids):
+        positions.setdefault(uid, position)
+
+    # Decorate with positions, so uids are only resolved once
+    default = len(uids)
+    decorated = []
+    for idx, antibiotic in enumerate(antibiotics):
+        uid = antibiotic if api.is_uid(antibiotic) else api.get_uid(antibiotic)
+        position = positions.get(uid, default)
+        decorated.append((position, idx, antibiotic))
+    return map(lambda item: item[2], sorted(decorated))
+
+
 def update_breakpoint_tables_choices(analysis, default_table=None):
     """Updates the choices option for each interim field from the passed-in
     analysis, that represents an antibiotic, with the list of breakpoints
@@ -237,16 +334,14 @@ def update_breakpoint_tables_choices(analysis, default_table=None):
     default_table = default_table or "0"
     microorganism = get_microorganism(analysis)
     interim_fields = analysis.getInterimFields()
+    uids = map(lambda interim: interim.get("uid"), interim_fields)
+    choices = get_breakpoint_tables_choices(microorganism, uids)
     for interim_field in interim_fields:
 
-        # Get the breakpoint tables for this antibiotic and microorganism
+        # Get the breakpoint tables for this antibiotic and the choices
         uid = interim_field.get("uid")
-        breakpoints = get_breakpoints_tables_for(microorganism, uid)
-        breakpoints_uids = map(api.get_uid, breakpoints)
-
-        # Convert these breakpoints to interim choices and update interim
-        choices = to_interim_choices(breakpoints, empty_value=_("N/S"))
-        interim_field.update({"choices": choices})
+        breakpoints_uids, interim_choices = choices.get(uid)
+        interim_field.update({"choices": interim_choices})
 
         # Set the default breakpoints table, if match
         value = interim_field.get("value", default_table)
@@ -258,6 +353,50 @@ def update_breakpoint_tables_choices(analysis, default_table=None):
     analysis.setInterimFields(interim_fields)
 
 
+def get_breakpoint_tables_choices(microorganism, antibiotics):
+    """Returns a dict with the antibiotic UIDs as keys and tuples of (uids,
+    choices) as values, where uids is the list of breakpoints tables that
+    better suit with the microorganism and the antibiotic, and choices are
+    these tables converted to interim choices. The choices are kept for the
+    duration of the current request, so they are only resolved once when
+    the same panel is assigned to more than one sample
+
+    :param microorganism: the microorganism the choices are for
+    :type microorganism: Microorganism object or None
+    :param antibiotics: the antibiotics the choices are for
+    :type antibiotics: list of Antibiotic objects or UIDs
+    :rtype: dict
+    """
+    category_uid = None
+    if microorganism:
+        category_uid = get_microorganism_category_uid(microorganism)
+        microorganism = api.get_uid(microorganism)
+
+    cache = get_request_cache("breakpoint_tables_choices")
+    index = get_breakpoints_tables_index()
+    choices = {}
+    for antibiotic in antibiotics:
+        uid = antibiotic
+        if api.is_object(antibiotic):
+            uid = api.get_uid(antibiotic)
+
+        key = (microorganism, uid)
+        if key not in cache:
+            # Get the breakpoint tables for this antibiotic and microorganism
+            table_uids = []
+            if microorganism and uid:
+                table_uids = index.search(uid, microorganism, category_uid)
+
+            # Convert these breakpoints to interim choices
+            tables = map(lambda b: (b, index.get_title(b)), table_uids)
+            interim_choices = to_interim_choices(tables, empty_value=_("N/S"))
+            cache[key] = (table_uids, interim_choices)
+
+        choices[uid] = cache[key]
+
+    return choices
+
+
 def update_extrapolated_reporting(analysis):
     """Updates the interim results options of the analysis that stores the
     selective reporting of extrapolated antibiotics. The function updates the
@@ -265,17 +404,23 @@ def update_extrapolated_reporting(analysis):
     reporting based on the representative antibiotics set
     """
     interim_fields = copy.deepcopy(analysis.getInterimFields()) or []
+    uids = map(lambda interim: interim["uid"], interim_fields)
+    antibiotics = dict(map(lambda b: (api.get_uid(b), b),
+                           get_antibiotic_brains(uids)))
     new_interim_fields = []
     for interim in interim_fields:
-        antibiotic = api.get_object(interim["uid"])
-        extrapolated = get_extrapolated_antibiotics(antibiotic)
+        antibiotic = antibiotics.get(interim["uid"])
+        if not antibiotic:
+            continue
+        extrapolated = get_extrapolated_antibiotics(antibiotic, uids=True)
         if not extrapolated:
             continue
 
         # Generate the choices list
         choices = []
-        for extra in extrapolated:
-            choice = "{}:{}".format(api.get_uid(extra), extra.abbreviation)
+        for extra in get_antibiotic_brains(extrapolated):
+            abbreviation = get_abbreviation(extra)
+            choice = "{}:{}".format(api.get_uid(extra), abbreviation)
             choices.append(choice)
 
         interim.update({
@@ -297,10 +442,15 @@ def to_interim(keyword, antibiotic, **kwargs):
         return antibiotic
 
     properties = SERVICES_SETTINGS[keyword]
-    obj = api.get_object(antibiotic)
+    if api.is_uid(antibiotic):
+        # Resolve the antibiotic from the catalog
+        antibiotic = get_antibiotic_brain(antibiotic, default=antibiotic)
+    if not api.is_brain(antibiotic):
+        antibiotic = api.get_object(antibiotic)
+    abbreviation = get_abbreviation(antibiotic)
     interim_field = {
-        "keyword": obj.abbreviation,
-        "title": obj.abbreviation,
+        "keyword": abbreviation,
+        "title": abbreviation,
         "choices": properties.get("choices", ""),
         "value": "",
         "unit": "",
@@ -308,8 +458,8 @@ def to_interim(keyword, antibiotic, **kwargs):
         "hidden": False,
         "size": properties.get("size", "5"),
         "type": properties.get("type", ""),
-        "full_title": api.get_title(obj),
-        "uid": api.get_uid(obj),
+        "full_title": api.get_title(antibiotic),
+        "uid": api.get_uid(antibiotic),
     }
     interim_field.update(kwargs)
     return interim_field
@@ -321,38 +471,43 @@ def get_result_options(analysis):
     possible result
     """
     def to_result_option(interim_field, interim_choice, result_value):
-        value = None
-
         # Abbreviation and full name of antibiotic
         abbreviation = interim_field.get("keyword")
         full_name = interim_field.get("full_title")
 
-        text = interim_choice.split(":")
-        if len(text) > 0:
-            interim_value = text[0]
-            result_text = len(text) > 1 and text[1].strip() or ""
-            result_text = "{}: {}".format(full_name, result_text)
-            value = {
-                "ResultText": result_text,
-                "ResultValue": result_value,
-                "InterimKeyword": abbreviation,
-                "InterimValue": interim_value,
-            }
-        return value
+        interim_value, result_text = interim_choice
+        result_text = "{}: {}".format(full_name, result_text.strip())
+        return {
+            "ResultText": result_text,
+            "ResultValue": result_value,
+            "InterimKeyword": abbreviation,
+            "InterimValue": interim_value,
+        }
+
+    # Result options only depend on the antibiotics and their choices, so
+    # they can be reused across analyses within the current request
+    interim_fields = analysis.getInterimFields()
+    key = tuple(map(lambda interim: (
+        interim.get("keyword"),
+        interim.get("full_title"),
+        interim.get("choices"),
+    ), interim_fields))
+    cache = get_request_cache("result_options")
+    if key in cache:
+        return copy.deepcopy(cache[key])
 
     options = []
-    for interim in analysis.getInterimFields():
+    for interim in interim_fields:
         choices = interim.get("choices")
         if not choices:
             continue
 
         # Generate the result options
-        for choice in choices.split("|"):
+        for choice in get_choices_table(choices).items:
             val = str(len(options))
-            option = to_result_option(interim, choice, val)
-            if option:
-                options.append(option)
+            options.append(to_result_option(interim, choice, val))
 
+    cache[key] = copy.deepcopy(options)
     return options
 
 
@@ -364,30 +519,59 @@ def get_analysis_title(keyword, microorganism):
     return title.format(api.get_title(obj))
 
 
-def get_ast_analyses(sample, short_title=None, skip_invalid=True):
+def get_ast_analyses(sample, short_title=None, skip_invalid=True,
+                     microorganism=None, keyword=None):
     """Returns the ast analyses assigned to the sample passed in and for the
-    microorganism name specified, if any
+    microorganism name or microorganism (object or UID) specified, if any
     """
-    analyses = sample.getAnalyses(getPointOfCapture=AST_POINT_OF_CAPTURE)
-    analyses = map(api.get_object, analyses)
+    brains = get_ast_analyses_brains(sample, microorganism=microorganism,
+                                     keyword=keyword,
+                                     skip_invalid=skip_invalid)
+    analyses = map(api.get_object, brains)
 
     if short_title:
         # Filter by microorganism name (short title)
         analyses = filter(lambda a: a.getShortTitle() == short_title, analyses)
 
+    return analyses
+
+
+def get_ast_analyses_brains(sample, microorganism=None, keyword=None,
+                            review_state=None, skip_invalid=True):
+    """Returns the catalog brains of the ast analyses assigned to the sample
+    passed in. The search is narrowed by the microorganism (object or UID),
+    keyword and review state specified, if any. Analyses that are cancelled,
+    retracted or rejected are skipped unless skip_invalid is False
+    """
+    query = {"getPointOfCapture": AST_POINT_OF_CAPTURE}
+    if microorganism:
+        # Filter by microorganism UID
+        microorganism = api.get_uid(microorganism)
+        query[MICROORGANISM_UID_INDEX] = microorganism
+    if keyword:
+        query["getKeyword"] = keyword
+    if review_state:
+        query["review_state"] = review_state
+    brains = sample.getAnalyses(**query)
+
+    # Queries against indexes that do not exist are dismissed silently
+    if microorganism:
+        brains = filter(lambda b: get_microorganism_uid(b) == microorganism,
+                        brains)
+
     # Skip invalid analyses
-    skip = skip_invalid and ["cancelled", "retracted", "rejected"] or []
-    analyses = filter(lambda a: api.get_review_status(a) not in skip, analyses)
+    if skip_invalid:
+        brains = filter(lambda b: b.review_state not in INVALID_STATES, brains)
 
-    return analyses
+    return brains
 
 
 def get_ast_siblings(analysis):
     """Returns the AST analyses for same sample and microorganism
     """
     sample = analysis.getRequest()
-    microorganism = analysis.getShortTitle()
-    analyses = get_ast_analyses(sample, short_title=microorganism)
+    microorganism = get_microorganism_uid(analysis)
+    analyses = get_ast_groups(sample).get(microorganism, [])
     return filter(lambda an: an != analysis, analyses)
 
 
@@ -401,25 +585,170 @@ def get_ast_group(analysis):
     return dict(zip(keywords, analyses))
 
 
+def get_ast_groups(sample):
+    """Returns a dict with the valid ast analyses from the sample passed-in
+    grouped by microorganism. The dict key is the UID of the microorganism
+    and the value is the list of analyses. The groups are resolved from the
+    microorganism UID metadata of the analyses, so renaming a microorganism
+    does not split its group. The result is cached for the duration of the
+    current request, so the AST calculations and views do not need to fetch
+    the analyses over and over
+    """
+    cache = get_request_cache("ast_groups")
+    sample_uid = api.get_uid(sample)
+    groups = cache.get(sample_uid)
+    if groups is None:
+        groups = collections.OrderedDict()
+        for brain in get_ast_analyses_brains(sample):
+            microorganism = get_microorganism_uid(brain)
+            analysis = api.get_object(brain)
+            groups.setdefault(microorganism, []).append(analysis)
+        cache[sample_uid] = groups
+    return groups
+
+
+def invalidate_ast_groups(sample):
+    """Flushes the AST analyses from the sample passed-in that are kept in the
+    request-scoped cache. Must be called whenever AST analyses are added,
+    removed or transitioned
+    """
+    cache = get_request_cache("ast_groups")
+    cache.pop(api.get_uid(sample), None)
+
+
+# Marker interfaces the valid AST analyses of a sample must provide for each
+# of the keys of the AST status of the sample
+AST_STATUS_MARKERS = (
+    ("submit", ISubmitted),
+    ("verify", IVerified),
+)
+
+
+def get_ast_status(sample):
+    """Returns the AST status of the sample passed-in: a dict with the valid
+    AST analyses of the sample by UID and, for each key of AST_STATUS_MARKERS,
+    the set of UIDs of the analyses that do not provide the marker yet. The
+    status is resolved from the live markers and review status of the
+    analyses, kept for the duration of the current request and updated on
+    analyses transitions
+    """
+    cache = get_request_cache("ast_status")
+    sample_uid = api.get_uid(sample)
+    status = cache.get(sample_uid)
+    if status is None:
+        status = dict([(key, set()) for key, marker in AST_STATUS_MARKERS])
+        status["analyses"] = {}
+        for analysis in get_ast_analyses(sample, skip_invalid=False):
+            set_ast_status(status, analysis)
+        cache[sample_uid] = status
+    return status
+
+
+def set_ast_status(status, analysis):
+    """Sets the analysis passed-in to the AST status storage, as pending for
+    the keys whose marker the analysis does not provide yet. Invalid analyses
+    are not pending for any key
+    """
+    uid = api.get_uid(analysis)
+    valid = api.get_review_status(analysis) not in INVALID_STATES
+    status["analyses"][uid] = analysis
+    for key, marker in AST_STATUS_MARKERS:
+        if valid and not marker.providedBy(analysis):
+            status[key].add(uid)
+        else:
+            status[key].discard(uid)
+
+
+def update_ast_status(analysis):
+    """Updates the AST status of the sample the analysis passed-in belongs to.
+    Must be called whenever an AST analysis is added, transitioned or rolled
+    back. Does nothing if the status was not resolved in the current request
+    """
+    cache = get_request_cache("ast_status")
+    status = cache.get(api.get_uid(analysis.getRequest()))
+    if status is not None:
+        set_ast_status(status, analysis)
+
+
+def is_ast_done(sample, key):
+    """Returns whether all valid AST analyses of the sample passed-in provide
+    the marker for the key of AST_STATUS_MARKERS. Pending analyses are checked
+    again, cause the sample guards are evaluated while the last analysis is
+    being transitioned, before the status is updated. Returns False as soon
+    as an analysis that is still pending is found
+    """
+    status = get_ast_status(sample)
+    pending = status[key]
+    for uid in list(pending):
+        set_ast_status(status, status["analyses"][uid])
+        if uid in pending:
+            return False
+    return True
+
+
+def invalidate_ast_status(sample):
+    """Flushes the AST status of the sample passed-in that is kept in the
+    request-scoped cache. Must be called whenever AST analyses are removed
+    """
+    cache = get_request_cache("ast_status")
+    cache.pop(api.get_uid(sample), None)
+
+
+def set_changed_antibiotics(analysis, uids):
+    """Keeps track of the antibiotics from the analysis passed-in whose values
+    changed during the current request, so the calculations only need to be
+    done for them
+    """
+    cache = get_request_cache("ast_changed")
+    cache.setdefault(api.get_uid(analysis), set()).update(uids)
+
+
+def pop_changed_antibiotics(analysis):
+    """Returns the uids of the antibiotics from the analysis passed-in whose
+    values changed during the current request and flushes them. Returns None
+    if the changes are unknown, meaning all antibiotics have to be considered
+    """
+    cache = get_request_cache("ast_changed")
+    return cache.pop(api.get_uid(analysis), None)
+
+
+def mark_updated_analysis(analysis):
+    """Keeps track of the analysis passed-in as updated by AST calculations
+    during the current request
+    """
+    cache = get_request_cache("ast_updated")
+    cache[api.get_uid(analysis)] = True
+
+
+def pop_updated_analyses(analyses):
+    """Returns the analyses from the list passed-in that have been updated by
+    AST calculations during the current request and flushes them
+    """
+    cache = get_request_cache("ast_updated")
+    return filter(lambda an: cache.pop(api.get_uid(an), False), analyses)
+
+
 def get_identified_microorganisms(sample):
     """Returns the identified microorganisms from the sample passed-in. It
     resolves the microorganisms by looking to the results of the
     "Identification" analysis
     """
     keyword = IDENTIFICATION_KEY
-    ans = sample.getAnalyses(getKeyword=keyword, full_objects=True)
+    ans = sample.getAnalyses(getKeyword=keyword)
 
     # Discard invalid analyses
-    skip = ["rejected", "cancelled", "retracted"]
-    ans = filter(lambda a: api.get_review_status(a) not in skip, ans)
+    ans = filter(lambda b: b.review_state not in INVALID_STATES, ans)
+    ans = map(api.get_object, ans)
 
     # Get the names of the selected microorganisms
     names = map(get_microorganisms_from_result, ans)
-    names = list(itertools.chain.from_iterable(names))
+    names = itertools.chain.from_iterable(names)
+    names = list(collections.OrderedDict.fromkeys(names))
 
     # Get the microorganisms
-    objects = api.get_setup().microorganisms.objectValues()
-    return filter(lambda m: api.get_title(m) in names, objects)
+    index = get_microorganisms_index()
+    objects = map(index.get_object, index.search(names))
+    return filter(None, objects)
 
 
 def get_microorganism(analysis):
@@ -432,13 +761,45 @@ def get_microorganism(analysis):
 def get_microorganisms(analyses):
     """Returns the list of microorganisms from the analyses passed-in
     """
-    names = map(lambda a: a.getShortTitle(), analyses)
-    objects = api.get_setup().microorganisms.objectValues()
-    objects = filter(lambda m: api.get_title(m) in names, objects)
+    uids = map(get_microorganism_uid, analyses)
+    uids = collections.OrderedDict.fromkeys(filter(None, uids))
+    index = get_microorganisms_index()
+    objects = map(index.get_object, uids)
     return filter(None, objects)
 
 
-def get_antibiotics(analyses, uids_only=False, filter_criteria=None):
+def get_microorganism_uid(analysis):
+    """Returns the UID of the microorganism the AST analysis passed-in is for.
+    If the analysis has no microorganism UID assigned, the microorganism is
+    resolved from the analysis' ShortTitle, the name of the microorganism
+    """
+    if api.is_brain(analysis):
+        uid = getattr(analysis, MICROORGANISM_UID_INDEX, None)
+        if api.is_uid(uid):
+            return uid
+        analysis = api.get_object(analysis)
+
+    uid = IAnnotations(analysis).get(MICROORGANISM_UID_KEY)
+    if api.is_uid(uid):
+        return uid
+
+    # Fallback to the microorganism with same name as the ShortTitle
+    index = get_microorganisms_index()
+    uids = index.search([analysis.getShortTitle()])
+    return uids and uids[0] or None
+
+
+def set_microorganism(analysis, microorganism):
+    """Assigns the microorganism passed-in to the AST analysis
+    """
+    uid = api.get_uid(microorganism) if microorganism else None
+    annotations = IAnnotations(analysis)
+    if annotations.get(MICROORGANISM_UID_KEY) != uid:
+        annotations[MICROORGANISM_UID_KEY] = uid
+
+
+def get_antibiotics(analyses, uids_only=False, filter_criteria=None,
+                    full_objects=True):
     """Returns the list of antibiotics assigned to the analyses passed-in
 
     :param analyses: analysis or analyses to look assigned antibiotics
@@ -447,7 +808,9 @@ def get_antibiotics(analyses, uids_only=False, filter_criteria=None):
     :type uids_only: bool
     :param filter_criteria: function to filter analysis interims by
     :type filter_criteria: function that accepts a dict as a parameter
-    :returns: list of antibiotic uids or objects
+    :param full_objects: whether to return objects or catalog brains
+    :type full_objects: bool
+    :returns: list of antibiotic uids, objects or brains
     :rtype: list
     """
     if isinstance(analyses, (list, tuple)):
@@ -478,6 +841,8 @@ def get_antibiotics(analyses, uids_only=False, filter_criteria=None):
 
     query = {"UID": uids, "portal_type": "Antibiotic"}
     brains = api.search(query, SETUP_CATALOG)
+    if not full_objects:
+        return brains
     return map(api.get_object, brains)
 
 
@@ -526,34 +891,32 @@ def get_breakpoints_tables_for(microorganism, antibiotic):
     """Returns the list of BreakpointsTable objects registered and active that
     have an entry for the microorganism and antibiotic passed-in
     """
-    query = {
-        "portal_type": "BreakpointsTable",
-        "sort_on": "sortable_title",
-        "sort_order": "ascending",
-        "is_active": True,
-    }
-    matches = []
-    for brain in api.search(query, SETUP_CATALOG):
-        obj = api.get_object(brain)
-        breakpoint = get_breakpoint(obj, microorganism, antibiotic)
-        if breakpoint:
-            matches.append(obj)
+    if not all([microorganism, antibiotic]):
+        return []
 
-    return matches
+    index = get_breakpoints_tables_index()
+    category_uid = get_microorganism_category_uid(microorganism)
+    uids = index.search(api.get_uid(antibiotic), api.get_uid(microorganism),
+                        category_uid)
+    return map(api.get_object, uids)
 
 
 def to_interim_choices(objects, empty_value=None):
     """Returns a string with a suitable format for its use as choices subfield
-    for interim fields
+    for interim fields. Items can be objects, brains, uids or tuples of
+    (uid, title)
     """
     choices = []
     if empty_value:
         choices.append("0:{}".format(empty_value))
 
     for obj in objects:
-        obj = api.get_object(obj)
-        uid = api.get_uid(obj)
-        title = api.get_title(obj)
+        if isinstance(obj, tuple):
+            uid, title = obj
+        else:
+            obj = api.get_object(obj)
+            uid = api.get_uid(obj)
+            title = api.get_title(obj)
         choice = "{}:{}".format(uid, title)
         choices.append(choice)
     return "|".join(choices)
@@ -563,38 +926,47 @@ def get_breakpoint(breakpoints_table, microorganism, antibiotic):
     """Returns the breakpoint from the breakpoints_table for the antibiotic and
     microorganism specified if exists. Returns empty dict otherwise
     """
-    if not all([breakpoints_table, microorganism, antibiotic]):
+    breakpoint = get_breakpoint_record(breakpoints_table, microorganism,
+                                       antibiotic)
+    if not breakpoint:
         return {}
+    return breakpoint.to_dict()
+
+
+def get_breakpoint_record(breakpoints_table, microorganism, antibiotic):
+    """Returns the breakpoint from the breakpoints_table for the antibiotic and
+    microorganism specified as an immutable Breakpoint record, if exists.
+    Returns None otherwise
+    """
+    if not all([breakpoints_table, microorganism, antibiotic]):
+        return None
 
     if breakpoints_table == "0":
         # Default N/A breakpoint
-        return {}
+        return None
 
     break_obj = api.get_object(breakpoints_table, default=None)
     if not break_obj:
-        return {}
+        return None
 
-    # Find out first if the antibiotic is set
-    antibiotic_uid = api.get_uid(antibiotic)
-    breakpoints = filter(lambda v: antibiotic_uid == v.get("antibiotic"),
-                         break_obj.breakpoints)
-    if not breakpoints:
-        return {}
+    # Look for the breakpoint for this specific microorganism or for the
+    # category it belongs to
+    index = get_breakpoints_index(break_obj)
+    return index.get(api.get_uid(antibiotic), api.get_uid(microorganism))
 
-    # Look for the breakpoint for this specific microorganism
-    microorganism_uid = api.get_uid(microorganism)
-    for val in breakpoints:
-        if val.get("microorganism") == microorganism_uid:
-            return copy.deepcopy(val)
 
-    # Look for the breakpoint for the category this microorganism belongs to
-    microorganism = api.get_object(microorganism)
-    category_uid = microorganism.category and microorganism.category[0] or ""
-    for val in breakpoints:
-        if val.get("microorganism") == category_uid:
-            return copy.deepcopy(val)
+def get_microorganism_category_uid(microorganism):
+    """Returns the UID of the category the microorganism belongs to, if any.
+    Returns an empty string otherwise
+    """
+    uid = api.get_uid(microorganism)
+    index = get_microorganisms_index()
+    if uid in index.paths:
+        return index.get_category(uid)
 
-    return {}
+    # Not indexed yet
+    microorganism = api.get_object(microorganism)
+    return microorganism.category and microorganism.category[0] or ""
 
 
 def get_non_ast_points_of_capture():
@@ -683,6 +1055,86 @@ def get_sensitivity_category(value, breakpoint, method, default=_marker):
         raise ValueError("Method not supported: {}".format(method))
 
 
+def get_sensitivity_categories(values, breakpoints, method,
+                               default=_marker):
+    """Returns the sensitivity categories inferred from the zone sizes or MIC
+    values and the breakpoints passed-in, in a single pass. The thresholds of
+    the breakpoints are converted to floats only once, so this function is
+    preferred over get_sensitivity_category when the categories of more than
+    one antibiotic have to be calculated. Returns the same results as
+    get_sensitivity_category, called for each value and breakpoint
+
+    :param values: sizes in mm of the inhibition zones or MIC values
+    :param breakpoints: breakpoints that define the sensitivity categories,
+        sorted as the values
+    :param method: the id of the method (service keyword) that refers to
+        MIC value or Zone size
+    :type values: list of string, float, int
+    :type breakpoints: list of dict or Breakpoint
+    :type method: string
+    :returns: the standard EUCAST sensitivity categories (R, S or I)
+    :rtype: list of string
+    """
+    breakpoints = list(breakpoints)
+    values = array("d", map(lambda value: api.to_float(value, -1), values))
+    if len(values) != len(breakpoints):
+        raise ValueError("Number of values and breakpoints do not match")
+
+    # Thresholds (R, S) for the method from each breakpoint
+    thresholds = get_thresholds(breakpoints)
+    step = len(THRESHOLD_FIELDS)
+    if method == ZONE_SIZE_KEY:
+        offset = THRESHOLD_FIELDS.index("diameter_r")
+    elif method == MIC_KEY:
+        offset = THRESHOLD_FIELDS.index("mic_r")
+    else:
+        offset = None
+
+    categories = []
+    for idx, value in enumerate(values):
+        pos = idx * step
+        if thresholds[pos] < 0:
+            # breakpoint is missing
+            if default is _marker:
+                raise ValueError("Breakpoint is missing")
+            categories.append(default)
+            continue
+
+        if value < 0:
+            # zero and negative are not possible
+            if default is _marker:
+                raise ValueError("Zone size is not valid")
+            categories.append(default)
+            continue
+
+        if offset is None:
+            raise ValueError("Method not supported: {}".format(method))
+
+        threshold_r = thresholds[pos + offset]
+        threshold_s = thresholds[pos + offset + 1]
+        if method == ZONE_SIZE_KEY:
+            resistant = threshold_r and value < threshold_r
+            susceptible = threshold_s and value >= threshold_s
+        else:
+            resistant = threshold_r and value > threshold_r
+            susceptible = threshold_s and value <= threshold_s
+
+        if resistant:
+            # R: resistant
+            categories.append("R")
+        elif susceptible:
+            # S: sensible
+            categories.append("S")
+        elif threshold_r and threshold_s:
+            # I: Susceptible at increased exposure
+            categories.append("I")
+        else:
+            # No breakpoints set for this method
+            categories.append("")
+
+    return categories
+
+
 def get_sensitivity_category_value(text, default=_marker):
     """Returns the choice value defined in the Sensitivity Category service for
     the option text passed-in
@@ -693,9 +1145,8 @@ def get_sensitivity_category_value(text, default=_marker):
     :rtype: string
     """
     # Resistance test (category) pre-defined choices
-    choices = get_choices(SERVICES_SETTINGS[RESISTANCE_KEY])
-    choices = dict(map(lambda choice: (choice[1], choice[0]), choices))
-    value = choices.get(text, None)
+    choices = SERVICES_SETTINGS[RESISTANCE_KEY].get("choices")
+    value = get_choices_table(choices).get_value(text)
     if value is None:
         if default is _marker:
             raise ValueError("Sensitivity category is not valid")
@@ -725,10 +1176,7 @@ def get_choices(interim):
     :rtype: list
     """
     choices = interim.get("choices", "")
-    if not choices:
-        return []
-    choices = map(lambda choice: choice.split(":"), choices.split("|"))
-    return map(lambda choice: (choice[0], choice[1]), choices)
+    return list(get_choices_table(choices).items)
 
 
 def is_interim_empty(interim):
@@ -798,11 +1246,31 @@ def get_interim_text(interim, default=_marker):
     if not isinstance(value, (list, tuple, set)):
         value = [value]
 
-    choices = dict(get_choices(interim))
-    texts = filter(None, [choices.get(v, None) for v in value])
+    choices = get_choices_table(choices)
+    texts = filter(None, [choices.get_text(v) for v in value])
     return "<br/>".join(texts)
 
 
+@ram.cache(object_stamp_cache_key)
+def get_interim_render_state(analysis):
+    """Returns a tuple with the render state of the interim fields from the
+    analysis passed-in that are not editable, with the display text of each
+    one. The result is kept in memory until the analysis is modified
+
+    :param analysis: AST analysis object
+    :returns: tuple of (keyword, text, rejected) for read-only interims
+    :rtype: tuple
+    """
+    state = []
+    for interim in analysis.getInterimFields():
+        if is_interim_editable(interim):
+            continue
+        text = get_interim_text(interim, default="")
+        rejected = is_rejected_interim(interim)
+        state.append((interim["keyword"], text, rejected))
+    return tuple(state)
+
+
 def is_interim_editable(interim):
     """Returns whether the interim is editable or not
 
@@ -823,6 +1291,71 @@ def is_interim_editable(interim):
     return True
 
 
+def get_abbreviation(antibiotic):
+    """Returns the abbreviation of the antibiotic passed-in. If a catalog
+    brain is passed-in, the abbreviation is read from the metadata, so the
+    antibiotic object does not need to be woken up
+
+    :param antibiotic: antibiotic brain or object
+    :returns: the abbreviation of the antibiotic
+    :rtype: string
+    """
+    if api.is_brain(antibiotic):
+        abbreviation = getattr(antibiotic, "abbreviation", None)
+        if abbreviation:
+            return abbreviation
+        antibiotic = api.get_object(antibiotic)
+    return antibiotic.abbreviation
+
+
+def get_extrapolated_uids(antibiotic):
+    """Returns the UIDs of the antibiotics extrapolated from the antibiotic
+    passed-in. If a catalog brain is passed-in, the UIDs are read from the
+    metadata, so the antibiotic object does not need to be woken up
+
+    :param antibiotic: antibiotic brain or object
+    :returns: the UIDs of the extrapolated antibiotics
+    :rtype: list
+    """
+    if api.is_brain(antibiotic):
+        uids = getattr(antibiotic, "extrapolated_antibiotics", None)
+        if isinstance(uids, (list, tuple)):
+            return list(uids)
+        antibiotic = api.get_object(antibiotic)
+    return list(antibiotic.extrapolated_antibiotics or [])
+
+
+def get_antibiotic_brains(uids):
+    """Returns the catalog brains of the antibiotics with the UIDs passed-in,
+    sorted in the same order. Brains are kept for the duration of the current
+    request, so only the UIDs not resolved yet are searched
+
+    :param uids: list of antibiotic UIDs
+    :returns: list of antibiotic catalog brains
+    :rtype: list
+    """
+    cache = get_request_cache("antibiotic_brains")
+    uids = filter(api.is_uid, uids)
+    missing = filter(lambda uid: uid not in cache, uids)
+    if missing:
+        query = {"UID": list(set(missing)), "portal_type": "Antibiotic"}
+        for brain in api.search(query, SETUP_CATALOG):
+            cache[api.get_uid(brain)] = brain
+    return filter(None, map(cache.get, uids))
+
+
+def get_antibiotic_brain(uid, default=None):
+    """Returns the catalog brain of the antibiotic with the UID passed-in, or
+    the default value if no antibiotic is catalogued with this UID
+
+    :param uid: UID of the antibiotic
+    :param default: value to return if the antibiotic is not found
+    :returns: antibiotic catalog brain
+    """
+    brains = get_antibiotic_brains([uid])
+    return brains and brains[0] or default
+
+
 def get_extrapolated_antibiotics(antibiotics, uids=False):
     """Returns the list of antibiotics extrapolated from the antibiotics
     passed-in, without duplicates. Only extrapolated antibiotics that are not
@@ -830,7 +1363,7 @@ def get_extrapolated_antibiotics(antibiotics, uids=False):
 
     :param antibiotics: representative antibiotics that have extrapolated
         antibiotics assigned
-    :type: list of IAntibiotic
+    :type: list of IAntibiotic or catalog brains
     :param uids: if true, returns UIDs. Returns Antibiotic objects otherwise
     :returns: the extrapolated list of antibiotics, without duplicates
     :rtype: list of UIDs or Antibiotic objects
@@ -839,7 +1372,7 @@ def get_extrapolated_antibiotics(antibiotics, uids=False):
         antibiotics = [antibiotics]
 
     # Extract extrapolated antibiotics from representative antibiotics
-    extrapolated = map(lambda an: an.extrapolated_antibiotics, antibiotics)
+    extrapolated = map(get_extrapolated_uids, antibiotics)
     extrapolated = filter(None, extrapolated)
 
     # Flatten the list
@@ -847,7 +1380,7 @@ def get_extrapolated_antibiotics(antibiotics, uids=False):
     extrapolated = filter(api.is_uid, extrapolated)
 
     # Remove existing antibiotics
-    existing_uids = map(api.get_uid, antibiotics)
+    existing_uids = set(map(api.get_uid, antibiotics))
     extrapolated = filter(lambda uid: uid not in existing_uids, extrapolated)
 
     # Remove duplicates while keeping the order
@@ -866,7 +1399,7 @@ def get_extrapolated_interims(antibiotics, keyword):
 
     :param antibiotics: representative antibiotics that have extrapolated
         antibiotics assigned
-    :type: list of IAntibiotic
+    :type: list of IAntibiotic or catalog brains
     :param keyword: keyword of the analysis service to extract the properties
         of a default interim field
     :type: str
@@ -874,9 +1407,13 @@ def get_extrapolated_interims(antibiotics, keyword):
     :rtype: list of dicts
     """
     interim_fields = []
-    existing_uids = map(api.get_uid, antibiotics)
-    for antibiotic in antibiotics:
-        extrapolated = antibiotic.extrapolated_antibiotics or []
+    existing_uids = set(map(api.get_uid, antibiotics))
+    extrapolated_uids = map(get_extrapolated_uids, antibiotics)
+
+    # Fetch the brains of all extrapolated antibiotics at once
+    get_antibiotic_brains(list(itertools.chain(*extrapolated_uids)))
+
+    for antibiotic, extrapolated in zip(antibiotics, extrapolated_uids):
         for uid in extrapolated:
             if uid in existing_uids:
                 continue
@@ -885,6 +1422,6 @@ def get_extrapolated_interims(antibiotics, keyword):
             interim_field = to_interim(keyword, uid, hidden=True)
             interim_field.update({"primary": api.get_uid(antibiotic)})
             interim_fields.append(interim_field)
-            existing_uids.append(uid)
+            existing_uids.add(uid)
 
     return interim_fields
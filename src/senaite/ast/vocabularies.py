@@ -18,6 +18,10 @@
 # Copyright 2020-2025 by it's authors.
 # Some rights reserved, see README and LICENSE.
 
+import threading
+from functools import wraps
+
+import Missing
 from bika.lims import api
 from bika.lims.catalog import SETUP_CATALOG
 from senaite.ast import messageFactory as _
@@ -28,6 +32,61 @@ from zope.schema.vocabulary import SimpleTerm
 from zope.schema.vocabulary import SimpleVocabulary
 
 
+# Built vocabularies by (site path, vocabulary name), as tuples of (setup
+# catalog counter, vocabulary)
+_vocabularies = {}
+_vocabularies_lock = threading.Lock()
+
+
+def get_setup_counter():
+    """Returns the counter of the setup catalog, that is incremented each time
+    an object is indexed or unindexed
+    """
+    return api.get_tool(SETUP_CATALOG).getCounter()
+
+
+def has_pending_changes():
+    """Returns whether the ZODB connection of the current site has objects
+    modified in the current transaction, that are not committed yet
+    """
+    connection = api.get_portal()._p_jar
+    if connection is None:
+        return False
+    return bool(connection._registered_objects)
+
+
+def cached_vocabulary(func):
+    """Decorator for the __call__ of context-independent vocabulary factories.
+    The vocabulary is built once and returned as is until the counter of the
+    setup catalog changes, so objects added, modified or removed are picked
+    up. Vocabularies are immutable once built, so they are shared among
+    threads and ZODB connections
+    """
+    @wraps(func)
+    def decorator(self, context):
+        key = (api.get_path(api.get_portal()), self.__class__.__name__)
+        counter = get_setup_counter()
+        cached = _vocabularies.get(key)
+        if cached and cached[0] == counter:
+            return cached[1]
+
+        vocabulary = func(self, context)
+        if has_pending_changes():
+            # The counter might be bumped by an uncommitted transaction that
+            # can be aborted yet, so the vocabulary is not shared
+            return vocabulary
+
+        with _vocabularies_lock:
+            # Do not override a vocabulary built from a newer state, as seen
+            # by another connection
+            cached = _vocabularies.get(key)
+            if not cached or cached[0] < counter:
+                _vocabularies[key] = (counter, vocabulary)
+        return vocabulary
+
+    return decorator
+
+
 def to_simple_term(obj, prefix=""):
     uid = api.get_uid(obj)
     title = "{}{}".format(prefix, api.get_title(obj))
@@ -43,6 +102,7 @@ def to_simple_vocabulary(query, catalog_id):
 @implementer(IVocabularyFactory)
 class AntibioticsVocabulary(object):
 
+    @cached_vocabulary
     def __call__(self, context):
         query = {
             "portal_type": "Antibiotic",
@@ -56,6 +116,7 @@ class AntibioticsVocabulary(object):
 @implementer(IVocabularyFactory)
 class MicroorganismsVocabulary(object):
 
+    @cached_vocabulary
     def __call__(self, context):
         query = {
             "portal_type": "Microorganism",
@@ -72,8 +133,7 @@ class SpeciesVocabulary(object):
     Microorganism objects, grouped
     """
 
-    _microorganisms = None
-
+    @cached_vocabulary
     def __call__(self, context):
         items = []
         query = {
@@ -82,19 +142,20 @@ class SpeciesVocabulary(object):
             "sort_on": "sortable_title",
             "sort_order": "ascending",
         }
+        microorganisms_grouped = self.get_microorganisms_grouped()
         for category in api.search(query, SETUP_CATALOG):
             cat_uid = api.get_uid(category)
             title = api.get_title(category).upper()
             items.append(SimpleTerm(cat_uid, title=title))
 
             # Append the microorganisms for this category
-            microorganisms = self.microorganisms_grouped.get(cat_uid, [])
+            microorganisms = microorganisms_grouped.get(cat_uid, [])
             for microorganism in microorganisms:
                 term = to_simple_term(microorganism, prefix="-- ")
                 items.append(term)
 
         # Append the microorganisms not yet categorized at the end
-        microorganisms = self.microorganisms_grouped.get(None, [])
+        microorganisms = microorganisms_grouped.get(None, [])
         if microorganisms:
             # Add a "Not categorized" group
             term = SimpleTerm("", title=_("Uncategorized").upper())
@@ -106,23 +167,31 @@ class SpeciesVocabulary(object):
 
         return SimpleVocabulary(items)
 
-    @property
-    def microorganisms_grouped(self):
-        if self._microorganisms is None:
-            self._microorganisms = {}
-            query = {
-                "portal_type": ["Microorganism"],
-                "is_active": True,
-                "sort_on": "sortable_title",
-                "sort_order": "ascending",
-            }
-            brains = api.search(query, SETUP_CATALOG)
-            for brain in brains:
-                obj = api.get_object(brain)
-                cat_uid = obj.category and obj.category[0] or None
-                self._microorganisms.setdefault(cat_uid, []).append(brain)
-
-        return self._microorganisms
+    def get_microorganisms_grouped(self):
+        """Returns a dict of category uid -> microorganism brains, sorted by
+        title. Microorganisms without category are stored with key None
+        """
+        microorganisms = {}
+        query = {
+            "portal_type": ["Microorganism"],
+            "is_active": True,
+            "sort_on": "sortable_title",
+            "sort_order": "ascending",
+        }
+        brains = api.search(query, SETUP_CATALOG)
+        for brain in brains:
+            cat_uid = self.get_category_uid(brain)
+            microorganisms.setdefault(cat_uid, []).append(brain)
+        return microorganisms
+
+    def get_category_uid(self, brain):
+        """Returns the UID of the category of the microorganism brain, from
+        the metadata if available
+        """
+        category = getattr(brain, "category_uid", None)
+        if category is None or category is Missing.Value:
+            category = api.get_object(brain).category
+        return category and category[0] or None
 
 
 @implementer(IVocabularyFactory)
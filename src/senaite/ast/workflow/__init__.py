@@ -19,6 +19,8 @@
 # Some rights reserved, see README and LICENSE.
 
 from senaite.ast import check_installed
+from senaite.ast.interfaces import IASTAnalysis
+from senaite.ast.utils import invalidate_ast_groups
 from senaite.ast.workflow import analysis as wf_analysis
 
 
@@ -29,6 +31,10 @@ def AfterAnalysisTransitionEventHandler(analysis, event):  # noqa CamelCase
     if not event.transition:
         return
 
+    # The transition might change the valid AST analyses of the sample
+    if IASTAnalysis.providedBy(analysis):
+        invalidate_ast_groups(analysis.getRequest())
+
     function_name = "after_{}".format(event.transition.id)
     if hasattr(wf_analysis, function_name):
         # Call the after_* function from events package
@@ -24,7 +24,12 @@ from datetime import datetime
 from bika.lims import api
 from senaite.ast import messageFactory as _
 from senaite.ast.config import IDENTIFICATION_KEY
+from senaite.ast.config import MICROORGANISM_UID_INDEX
 from senaite.ast.interfaces import IASTAnalysis
+from senaite.ast.utils import get_microorganism
+from senaite.ast.utils import invalidate_ast_groups
+from senaite.ast.utils import set_microorganism
+from senaite.ast.utils import update_ast_status
 from senaite.core.api import dtime as dt
 from senaite.core.catalog import SETUP_CATALOG
 
@@ -63,6 +68,9 @@ def after_submit(analysis):
     # attribute, will be rendered in read-only mode
     update_interim_status(analysis)
 
+    # Keep the AST status of the sample up-to-date for the sample guards
+    update_ast_status(analysis)
+
 
 def after_verify(analysis):
     """Event fired when an analysis is verified
@@ -77,6 +85,9 @@ def after_verify(analysis):
     # attribute, will be rendered in read-only mode
     update_interim_status(analysis)
 
+    # Keep the AST status of the sample up-to-date for the sample guards
+    update_ast_status(analysis)
+
 
 def after_retest(analysis):
     """Event fired when an analysis is retested
@@ -90,6 +101,12 @@ def after_retest(analysis):
 
     # Set the original interim fields to the retest
     copy_interims(source, analysis)
+    copy_microorganism(source, analysis)
+
+    # A new AST analysis has been added to the sample
+    invalidate_ast_groups(analysis.getRequest())
+    update_ast_status(source)
+    update_ast_status(analysis)
 
 
 def after_retract(analysis):
@@ -98,6 +115,9 @@ def after_retract(analysis):
     if not IASTAnalysis.providedBy(analysis):
         return
 
+    # The retracted analysis is no longer valid for the sample guards
+    update_ast_status(analysis)
+
     # The original analysis is the one being retracted
     retest = analysis.getRetest()
     if not retest:
@@ -105,6 +125,21 @@ def after_retract(analysis):
 
     # Set the original interim fields to the new analysis
     copy_interims(analysis, retest)
+    copy_microorganism(analysis, retest)
+
+    # A new AST analysis has been added to the sample
+    invalidate_ast_groups(retest.getRequest())
+    update_ast_status(retest)
+
+
+def after_reject(analysis):
+    """Event fired when an analysis is rejected
+    """
+    if not IASTAnalysis.providedBy(analysis):
+        return
+
+    # The rejected analysis is no longer valid for the sample guards
+    update_ast_status(analysis)
 
 
 def copy_interims(source, destination, keep_status=False):
@@ -124,6 +159,14 @@ def copy_interims(source, destination, keep_status=False):
     destination.setInterimFields(interim_fields)
 
 
+def copy_microorganism(source, destination):
+    """Assigns the microorganism from the source analysis to the destination
+    """
+    microorganism = get_microorganism(source)
+    set_microorganism(destination, microorganism)
+    destination.reindexObject(idxs=[MICROORGANISM_UID_INDEX])
+
+
 def update_interim_status(analysis):
     """Updates interim fields with the analysis status information
     """
@@ -1,9 +1,11 @@
 import ASTPanelAssignController from "./components/astpanelassign.coffee"
+import BreakpointsEditorController from "./components/breakpointseditor.coffee"
 
 document.addEventListener("DOMContentLoaded", () => {
   console.debug("*** SENAITE AST JS LOADED ***");
 
   // Initialize controllers
   window.ast_panel_assign = new ASTPanelAssignController();
+  window.breakpoints_editor = new BreakpointsEditorController();
 
 });